@@ -1,20 +1,19 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 import colours
 import random
 import entity_factories
 import utility
-from utility import Neighbourhood
-from entity import EntityID
-from rooms import RoomType
-from jobs import JobEffort, JobUntil, JobActorCondition
+from rooms import Room, RoomType
+from needs import Activity, Need
+from jobs import BaseJob, JobEffort, JobUntil, JobNeed
 from datetime import datetime, timedelta
 
 if TYPE_CHECKING:
     from engine import Engine
-    from entity import Entity
+    from entity import Actor, Entity
     from actions import MapMouseDesiredAction
 
 
@@ -86,6 +85,7 @@ class MovementAction(ActionWithDirection):
         if self.engine.game_map.tiles[dest_x, dest_y]["wearable"]:
             self.engine.game_map.tiles[dest_x, dest_y]["wear"] = max(0, self.engine.game_map.tiles[dest_x, dest_y]["wear"] - self.entity.weight * (random.random() * 0.001))
             self.engine.game_map.tiles[dest_x, dest_y]["graphic"]["bg"] = colours.colour_lerp(colours.DRY_MUD_BROWN, self.engine.game_map.tiles[dest_x, dest_y]["original_bg"], self.engine.game_map.tiles[dest_x, dest_y]["wear"])
+            self.engine.game_map.refresh_cost(dest_x, dest_y)
 
 
 class WaitAction(Action):
@@ -99,8 +99,10 @@ class CreateJobAction(Action):
         self.job = job
 
     def perform(self) -> None:
-        self.engine.message_log.add_message("Created Job", colours.WHITE)
-        self.engine.jobs.queue.put(self.job)
+        if self.engine.jobs.add_job(self.job):
+            self.engine.message_log.add_message("Created Job", colours.WHITE)
+        else:
+            self.engine.message_log.add_message("Too many jobs, job not created", colours.WHITE)
 
 
 class CreatePropAction(Action):
@@ -115,91 +117,26 @@ class CreatePropAction(Action):
 
 
 class CreateWallAction(Action):
-    def __init__(self, entity: Entity, location: Tuple[int, int]) -> None:
+    def __init__(self, entity: Entity, locations) -> None:
         super().__init__(entity)
 
-        self.location = location
+        # Either a single location or a list of them, which are all built and retiled in one go
+        if isinstance(locations[0], (list, tuple)):
+            self.locations = locations
+        else:
+            self.locations = [locations]
 
     def perform(self):
-        surrounding_entities = self.engine.game_map.get_surrounding_entities(self.location, Neighbourhood.MOORE)
-        """
-        Surrounding Entities:
-        0 1 2
-        3   4
-        5 6 7
-        """
+        game_map = self.engine.game_map
+        for location in self.locations:
+            entity_factories.wall.spawn(game_map, location[0], location[1])
+            game_map.tiles[location[0], location[1]]["walkable"] = False
+            game_map.refresh_cost(location[0], location[1])
 
-        # Pick a tile for this new wall
-        surrounding_walls = [False] * len(surrounding_entities)
-        index = 0
-        for entity_list in surrounding_entities:
-            for entity in entity_list:
-                if entity.is_type(EntityID.WALL):
-                    surrounding_walls[index] = True
-                    break
-            index += 1
-
-        wall = entity_factories.wall.spawn(self.engine.game_map, self.location[0], self.location[1])
-        if surrounding_walls[1] and surrounding_walls[3] and surrounding_walls[4] and surrounding_walls[6]:
-            wall.char = "╬"
-        elif surrounding_walls[3] and surrounding_walls[1] and surrounding_walls[4]:
-            wall.char = "╩"
-        elif surrounding_walls[3] and surrounding_walls[6] and surrounding_walls[4]:
-            wall.char = "╦"
-        elif surrounding_walls[3] and surrounding_walls[1] and surrounding_walls[6]:
-            wall.char = "╣"
-        elif surrounding_walls[1] and surrounding_walls[4] and surrounding_walls[6]:
-            wall.char = "╠"
-        elif surrounding_walls[3] and surrounding_walls[1]:
-            wall.char = "╝"
-        elif surrounding_walls[1] and surrounding_walls[4]:
-            wall.char = "╚"
-        elif surrounding_walls[4] and surrounding_walls[6]:
-            wall.char = "╔"
-        elif surrounding_walls[3] and surrounding_walls[6]:
-            wall.char = "╗"
-        elif surrounding_walls[3] or surrounding_walls[4]:
-            wall.char = "═"
-        else:
-            wall.char = "║"
-
-        self.engine.game_map.tiles[self.location[0], self.location[1]]["walkable"] = False
-
-        # Update the surrounding wall tiles
-        for entity_list in surrounding_entities:
-            for entity in entity_list:
-                if entity.is_type(EntityID.WALL):
-                    second_order_surrounding_entities = self.engine.game_map.get_surrounding_entities([entity.x, entity.y], Neighbourhood.MOORE)
-                    surrounding_walls = [False] * len(second_order_surrounding_entities)
-                    index = 0
-                    for n in second_order_surrounding_entities:
-                        for i in n:
-                            if i.is_type(EntityID.WALL):
-                                surrounding_walls[index] = True
-                                break
-                        index += 1
-                    if surrounding_walls[1] and surrounding_walls[3] and surrounding_walls[4] and surrounding_walls[6]:
-                        entity.char = "╬"
-                    elif surrounding_walls[3] and surrounding_walls[1] and surrounding_walls[4]:
-                        entity.char = "╩"
-                    elif surrounding_walls[3] and surrounding_walls[6] and surrounding_walls[4]:
-                        entity.char = "╦"
-                    elif surrounding_walls[3] and surrounding_walls[1] and surrounding_walls[6]:
-                        entity.char = "╣"
-                    elif surrounding_walls[1] and surrounding_walls[4] and surrounding_walls[6]:
-                        entity.char = "╠"
-                    elif surrounding_walls[3] and surrounding_walls[1]:
-                        entity.char = "╝"
-                    elif surrounding_walls[1] and surrounding_walls[4]:
-                        entity.char = "╚"
-                    elif surrounding_walls[4] and surrounding_walls[6]:
-                        entity.char = "╔"
-                    elif surrounding_walls[3] and surrounding_walls[6]:
-                        entity.char = "╗"
-                    elif surrounding_walls[3] or surrounding_walls[4]:
-                        entity.char = "═"
-                    elif surrounding_walls[1] or surrounding_walls[6]:
-                        entity.char = "║"
+        # Pick glyphs for the new walls and the walls around them that they now join up with
+        x = [location[0] for location in self.locations]
+        y = [location[1] for location in self.locations]
+        game_map.retile_walls(min(x) - 1, min(y) - 1, max(x) + 1, max(y) + 1)
 
 
 class CreateFloorAction(Action):
@@ -232,46 +169,62 @@ class CreateRoomAction(Action):
         self.engine.game_map.room_holder.add_room(self.room_type, self.engine.game_map, self.tiles)
 
 
-class GoToServiceAction(Action):
-    def __init__(self, entity: Entity, duration: timedelta) -> None:
+class GatherAction(Action):
+    """Send a group of actors to a room, giving each of them their own spot in it to go to."""
+
+    def __init__(self, entity: Entity, actors: List[Actor], room_type: RoomType) -> None:
         super().__init__(entity)
-        self.duration = duration
+        self.actors = actors
+        self.room_type = room_type
 
     def perform(self):
-        quire = self.entity.gamemap.room_holder.get_room(RoomType.QUIRE)
-        if quire is not None:
-            finish_time = self.engine.calendar.get_current_date_time() + self.duration
-            self.entity.schedule.jobs.append(JobUntil([quire.get_random_point_in_room()], finish_time, "Service"))
-        else:
-            print(f"Tried to make {self.entity.name} got to service, but no quire exists!")
+        actors = [actor for actor in self.actors if actor.is_alive]
+        if not actors:
+            return
 
+        room = self.engine.game_map.get_room(self.room_type)
+        if room is None:
+            print(f"Tried to gather {len(actors)} actors in the {Room.get_room_name(self.room_type)}, but there isn't one!")
+            return
 
-class GoToMealAction(Action):
-    def __init__(self, entity: Entity) -> None:
-        super().__init__(entity)
+        for actor, slot in zip(actors, room.get_random_points_in_room(len(actors))):
+            actor.schedule.jobs.append(self.create_job(actor, slot, room))
 
-    def perform(self):
-        refectory = self.entity.gamemap.get_room(RoomType.REFECTORY)
-        if refectory is not None:
-            self.entity.schedule.jobs.append(JobActorCondition([refectory.get_random_point_in_room()], lambda x: x.animal.hunger > 0, "Meal"))  # TODO Make a better wants_food type function
+    def create_job(self, actor: Actor, slot: Tuple[int, int], room: Room) -> BaseJob:
+        raise NotImplementedError()
 
 
-class GoToBedAction(Action):
-    def __init__(self, entity: Entity) -> None:
-        super().__init__(entity)
+class GoToServiceAction(GatherAction):
+    def __init__(self, entity: Entity, actors: List[Actor], duration: timedelta) -> None:
+        super().__init__(entity, actors, RoomType.QUIRE)
+        self.duration = duration
 
     def perform(self):
-        dorm = self.entity.gamemap.get_room(RoomType.DORMITORY)
-        if dorm is not None:
-            self.entity.schedule.jobs.append(JobActorCondition([dorm.get_random_point_in_room()], lambda x: x.animal.energy > 0, "Sleep"))  # TODO Make a better wants_sleep type function
+        self.finish_time = self.engine.calendar.minutes + int(self.duration.total_seconds() // 60)
+        super().perform()
 
+    def create_job(self, actor: Actor, slot: Tuple[int, int], room: Room) -> BaseJob:
+        return JobUntil([slot], self.finish_time, name="Service", room=room)
 
-class RemovePendingJobAction(Action):
-    def __init__(self, entity: Entity, location: Tuple[int, int]) -> None:
-        super().__init__(entity)
-        self.location = location
+
+class GoToMealAction(GatherAction):
+    def __init__(self, entity: Entity, actors: List[Actor]) -> None:
+        super().__init__(entity, actors, RoomType.REFECTORY)
+
+    def create_job(self, actor: Actor, slot: Tuple[int, int], room: Room) -> BaseJob:
+        return JobNeed([slot], Need.HUNGER, actor.animal.max_want_level - 1, activity=Activity.EATING, name="Meal", room=room)  # TODO Make a better wants_food type function
+
+
+class GoToBedAction(GatherAction):
+    """Send everyone to bed until they are rested, and keep them there until the horarium's next event."""
+
+    def __init__(self, entity: Entity, actors: List[Actor]) -> None:
+        super().__init__(entity, actors, RoomType.DORMITORY)
+        self.wake_minute = None
 
     def perform(self):
-        for entity in self.entity.gamemap.get_entities_at_location(self.location[0], self.location[1]):
-            if entity.id is EntityID.PENDING_JOB:
-                self.entity.gamemap.remove_entity(entity)
+        self.wake_minute = self.engine.monastery.horarium.get_next_minute()
+        super().perform()
+
+    def create_job(self, actor: Actor, slot: Tuple[int, int], room: Room) -> BaseJob:
+        return JobNeed([slot], Need.ENERGY, actor.animal.max_want_level - 1, activity=Activity.SLEEPING, earliest_finish=self.wake_minute, name="Sleep", room=room)  # TODO Make a better wants_sleep type function
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+from enum import IntEnum
+from typing import Callable, Iterable, Optional, Tuple, TYPE_CHECKING
+
+import entity_factories
+import utility
+from actions import Action, CreateFloorAction, CreatePropAction, CreateWallAction
+from jobs import JobEffort, JobType
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from entity import Entity
+
+
+class BlueprintKind(IntEnum):
+    """What is going to be built in a cell of a blueprint. Stored as a small int so whole blueprints fit in a numpy array."""
+    NONE = 0
+    WALL = 1
+    FLOOR = 2
+    PILLAR = 3
+    FIELD = 4
+
+    @staticmethod
+    def get_job_type(kind: BlueprintKind) -> JobType:
+        if kind is BlueprintKind.WALL:
+            return JobType.WALL
+        if kind is BlueprintKind.FLOOR:
+            return JobType.FLOOR
+        if kind is BlueprintKind.PILLAR:
+            return JobType.PROP
+        if kind is BlueprintKind.FIELD:
+            return JobType.FIELD
+        return JobType.OTHER
+
+    @staticmethod
+    def get_job_name(kind: BlueprintKind) -> str:
+        if kind is BlueprintKind.WALL:
+            return "Build Wall"
+        if kind is BlueprintKind.FLOOR:
+            return "Build Floor"
+        if kind is BlueprintKind.PILLAR:
+            return "Create Prop"
+        if kind is BlueprintKind.FIELD:
+            return "Create Field"
+        return "<unnamed>"
+
+
+# Job board priority of each kind, indexed by the kind's value
+KIND_PRIORITIES = np.array([JobType.get_priority(BlueprintKind.get_job_type(kind)) for kind in BlueprintKind])
+
+
+class CompleteBlueprintCellAction(Action):
+    def __init__(self, entity: Entity, blueprint: Blueprint, index: int) -> None:
+        super().__init__(entity)
+        self.blueprint = blueprint
+        self.index = index
+
+    def perform(self):
+        self.blueprint.complete_cell(self.index)
+
+
+class Blueprint:
+    """A build order covering a whole area, kept as an array of cells and an array of what goes in each one.
+
+    Rather than a job per cell sitting on the job board from the start, only batch_size cells are handed to the
+    board at a time, highest priority first, and each finished cell lets the next one out.
+    Cells still waiting to be built are marked in the map's pending_build layer so they can be drawn.
+    If given, on_cell_complete is called with the position and kind of each cell once it has been built.
+    """
+
+    def __init__(self, engine: Engine, cells: Iterable[Tuple[int, int]], kinds: Iterable[int], batch_size: int = 16, on_cell_complete: Optional[Callable[[int, int, BlueprintKind], None]] = None):
+        self.engine = engine
+        self.cells = np.asarray(cells, dtype=np.int32).reshape(-1, 2)
+        self.kinds = np.asarray(kinds, dtype=np.uint8)
+        self.batch_size = batch_size
+        self.on_cell_complete = on_cell_complete
+
+        # Walls first, then pillars, then floors, keeping the order we were given within each kind
+        self.order = np.argsort(-KIND_PRIORITIES[self.kinds], kind="stable")
+        self.next_release = 0  # Index into order of the next cell to hand to the job board
+        self.released = 0  # Cells on the job board or being worked on
+        self.remaining = len(self.cells)
+
+        np.add.at(engine.game_map.pending_build, (self.cells[:, 0], self.cells[:, 1]), 1)
+
+    def is_finished(self) -> bool:
+        return self.remaining == 0
+
+    def release(self):
+        """Top the job board back up with jobs for our next cells."""
+        jobs = self.engine.jobs
+        while self.released < self.batch_size and self.next_release < len(self.order) and not jobs.is_full():
+            jobs.add_job(self.create_job(self.order[self.next_release]))
+            self.next_release += 1
+            self.released += 1
+
+    def create_job(self, index: int) -> JobEffort:
+        x, y = int(self.cells[index, 0]), int(self.cells[index, 1])
+        kind = BlueprintKind(self.kinds[index])
+
+        # Walls are built from beside them, since they can't be stood on once they are done
+        if kind is BlueprintKind.WALL:
+            locations = utility.get_vonneumann_tiles([x, y])
+        else:
+            locations = [[x, y]]
+
+        completion_action = CompleteBlueprintCellAction(self.engine.player, self, index)
+        return JobEffort(locations, 1, completionAction=completion_action, name=BlueprintKind.get_job_name(kind), job_type=BlueprintKind.get_job_type(kind))
+
+    def complete_cell(self, index: int):
+        x, y = int(self.cells[index, 0]), int(self.cells[index, 1])
+        kind = BlueprintKind(self.kinds[index])
+        player = self.engine.player
+
+        if kind is BlueprintKind.WALL:
+            CreateWallAction(player, [x, y]).perform()
+        elif kind is BlueprintKind.FLOOR:
+            CreateFloorAction(player, [x, y]).perform()
+        elif kind is BlueprintKind.PILLAR:
+            CreatePropAction(player, entity_factories.stone_pillar, [x, y]).perform()
+        elif kind is BlueprintKind.FIELD:
+            CreatePropAction(player, entity_factories.field, [x, y]).perform()
+
+        self.engine.game_map.pending_build[x, y] -= 1
+        if self.on_cell_complete is not None:
+            self.on_cell_complete(x, y, kind)
+
+        self.released -= 1
+        self.remaining -= 1
+        self.release()
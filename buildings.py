@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+from typing import Dict
+
+from blueprints import BlueprintKind
+
+"""
+Building templates drawn as ascii. x, u, e, r, q and w are walls, o is a pillar, space is left alone and anything
+else is floor. Templates are compiled into arrays the first time they are used, see get_building.
+"""
+
+REFECTORY = ('''\
+        quuuuuw
+        x.....x
+        x.....x
+        x.....x
+        euu.uur
+        ''')
+
+DORMITORY = ('''\
+        quu.uuw
+        x.....xx
+        x......x
+        x......x
+        x.....xx
+        euuuuur
+        ''')
+
+CHURCH = ('''\
+        quuuuuw
+        x.....x
+        x.o.o.x
+        x.....x
+     quur.....euuw
+     x...........x
+     x...........x  xuux
+     x...........x  x..x
+     euuw.....qu.r  x..x
+        x.o.o.x..uuuu.uuw
+        x.....x.........x
+        x.o.o.x.o o o o.x
+        x.......       .x
+        x.o.o.x.o     o.x
+        x.....x.       .x
+        x.o.o.x.o     o.x
+        x.....x.       .x
+        x.o.o.x.o o o o.x
+        x.....x.........x
+        eu.u.uruuuuuuuuur
+        ''')
+
+TINY_CHURCH = ('''\
+         quw
+        qroew
+        xh.hx
+        xh...
+        xhhhx
+        euuur
+        ''')
+
+SMALLER_CHURCH = ('''\
+         quuuw
+        qr...ew
+        x.....x
+        xh...hx
+        xh...hx
+      qur.....euw
+      x.........x
+      x.........x
+      x.........x
+      euw.o.o.qur
+        xhh.hhx
+        xho.ohx
+        xhh.hhx
+        xho.ohx
+        xhh.hhx
+        x.o.o.x
+        x.....x
+        euu.uur
+        ''')
+
+SMALL_CHURCH = ('''\
+         quuuuw
+        qr....ew
+        x......x
+        x.o..o.x
+        x......x
+     quur.o..o.euuw
+     x............x
+     x............x
+     x............x
+     x............x
+     euuw.o..o.quur
+        x......x
+        x.o..o.x
+        x......x
+        x.o..o.x
+        x......x
+        x.o..o.x
+        x......x
+        x.o..o.x
+        x......x
+        eu.uu.ur
+        ''')
+
+BIG_CHURCH = ('''\
+         quuuuuuuw
+        qr.......ew
+        x.........x
+        x.........x
+        x..o...o..x
+        x..|...|..x
+        x..|...|..x
+        x..|...|..x
+        x..|...|..x
+        x..o...o..x
+  quuuuur.........euuuuuw
+  x.....................x
+  x.o.o.o..o...o..o.o.o.x
+  x.....................x
+  x.....................x
+  x.....................x
+  x.o.o.o..o...o..o.o.o.x
+  x.....................x
+  euuuuuw..o...o..quuuuuruuuuuuuw
+        x.........x.............x
+        x..o...o..x.............x
+        x.........x..         ..xuuuuuuuuuw
+        x..o...o..x..         ..x.........x
+        x.........x..         ..x.o.o.o.o.x
+        x..o...o..x..         ..x.........x
+        x.........x..         ..x.........x
+        x..o...o..x..         ..x.o.o.o.o.x
+        x.........x..         ..x.........x
+        x..o...o..x..         ..xuuuuuuuuur
+        x.........x..         ..x
+        x..o...o..x.............x
+        x.........x.............x
+        x..o...o..xuuuuuuuuuuuuur
+        x.........x
+        x..o...o..x
+        x.........x
+        eu..uuu..ur
+        ''')
+
+BUILDINGS = {
+    "refectory": REFECTORY,
+    "dormitory": DORMITORY,
+    "church": CHURCH,
+    "tiny_church": TINY_CHURCH,
+    "smaller_church": SMALLER_CHURCH,
+    "small_church": SMALL_CHURCH,
+    "big_church": BIG_CHURCH,
+}
+
+# Kind of cell for each template character, indexed by the character's code
+CHARACTER_KINDS = np.full(128, BlueprintKind.FLOOR, dtype=np.uint8)
+CHARACTER_KINDS[[ord(character) for character in "xuerqw"]] = BlueprintKind.WALL
+CHARACTER_KINDS[ord("o")] = BlueprintKind.PILLAR
+CHARACTER_KINDS[ord(" ")] = BlueprintKind.NONE
+
+
+class CompiledBuilding:
+    """A building template turned into arrays, ready to be stamped down anywhere on the map."""
+
+    def __init__(self, template: str):
+        lines = template.splitlines()
+        width = max((len(line) for line in lines), default=0)
+
+        # Characters laid out [x, y] to match the map
+        characters = np.array([np.frombuffer(line.ljust(width).encode("ascii"), dtype=np.uint8) for line in lines], dtype=np.uint8).T.reshape(width, len(lines))
+        kinds = CHARACTER_KINDS[characters]
+
+        cell_x, cell_y = np.nonzero(kinds)
+        order = np.lexsort((cell_x, cell_y))  # Row by row, the same order the template is read in
+        self.cells = np.stack((cell_x[order], cell_y[order]), axis=1).astype(np.int32)  # Offsets from where the building is placed
+        self.kinds = kinds[cell_x[order], cell_y[order]]
+
+
+compiled_buildings: Dict[str, CompiledBuilding] = dict()
+
+
+def get_building(name: str) -> CompiledBuilding:
+    """Return the named building template, compiling it the first time it is asked for."""
+    building = compiled_buildings.get(name)
+    if building is None:
+        building = CompiledBuilding(BUILDINGS[name])
+        compiled_buildings[name] = building
+
+    return building
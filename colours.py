@@ -1,5 +1,7 @@
 from typing import Tuple
 
+import numpy as np  # type: ignore
+
 GRASS_GREEN = (17, 41, 6)
 DARK_GREEN = (40, 50, 6)
 DRY_MUD_BROWN = (75, 57, 35)
@@ -23,6 +25,15 @@ def colour_lerp(colour1: Tuple[int, int, int], colour2: Tuple[int, int, int], t:
     return (int(colour1[0] + t * (colour2[0] - colour1[0])), int(colour1[1] + t * (colour2[1] - colour1[1])), int(colour1[2] + t * (colour2[2] - colour1[2])))
 
 
+def colour_lerp_array(colour1, colour2, t: np.ndarray) -> np.ndarray:
+    """colour_lerp for whole arrays at once.
+    The colours can be single colours or (..., 3) arrays of them, t is an array of weights with the same leading shape."""
+    colour1 = np.asarray(colour1, dtype=np.float64)
+    colour2 = np.asarray(colour2, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)[..., np.newaxis]
+    return (colour1 + t * (colour2 - colour1)).astype(np.int32)
+
+
 def lighten_darken_colour(col: Tuple[int, int, int], amt) -> Tuple[int, int, int]:
     r = col[0] + amt
     b = (col[1] & 0x00FF) + amt
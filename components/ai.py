@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import List, Tuple, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np  # type: ignore
 import tcod
-from jobs import JobEffort
+from jobs import AssignmentMode
+from needs import Activity
 import random
 
 from actions import Action, MovementAction, WaitAction
@@ -13,14 +14,34 @@ from rooms import RoomType, Room
 
 if TYPE_CHECKING:
     from entity import Actor
+    from flow_fields import FlowField
 
 
 class BaseAI(Action, BaseComponent):
     entity: Actor
 
+    def __init__(self, entity: Actor):
+        super().__init__(entity)
+        # Path being followed by move_towards, along with what it was computed for
+        self.path: List[Tuple[int, int]] = []
+        self.path_destination = None
+        self.path_version = -1
+
     def perform(self) -> None:
         raise NotImplementedError()
 
+    def wants_job(self) -> bool:
+        """Whether this actor should be handed a job from the job board."""
+        return False
+
+    def is_resting(self) -> bool:
+        """Whether this actor is only waiting for something to happen, so time can be skipped without changing what they do."""
+        return False
+
+    def get_wake_minute(self) -> Optional[int]:
+        """Calendar minute this actor will stop resting at by itself, or None if there's no telling."""
+        return None
+
     def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
         """Compute and return a path to the target position.
 
@@ -36,6 +57,76 @@ class BaseAI(Action, BaseComponent):
         # Convert from List[List[int]] to List[Tuple[int, int]].
         return [(index[0], index[1]) for index in path]
 
+    def move_towards(self, dest_x: int, dest_y: int) -> bool:
+        """Take one step along a path to the target position.
+
+        The path is kept between calls and only recomputed when it goes stale.
+        Returns False if there is no valid path.
+        """
+        if not self.is_path_valid(dest_x, dest_y):
+            # Don't search the whole map for a path that can't exist
+            regions = self.entity.gamemap.get_walkable_regions()
+            region = regions[self.entity.x, self.entity.y]
+            if region and regions[dest_x, dest_y] != region:
+                self.path = []
+                return False
+
+            self.path = self.get_path_to(dest_x, dest_y)
+            self.path_destination = (dest_x, dest_y)
+            self.path_version = self.entity.gamemap.cost_version
+
+        if not self.path:
+            return False
+
+        step_x, step_y = self.path[0]
+        MovementAction(self.entity, step_x - self.entity.x, step_y - self.entity.y).perform()
+
+        if self.entity.x == step_x and self.entity.y == step_y:
+            self.path.pop(0)
+
+        return True
+
+    def follow_flow_field(self, flow_field: FlowField) -> bool:
+        """Take one step downhill on a shared flow field. Returns False if there is nowhere closer to go."""
+        step = flow_field.get_next_step(self.entity.x, self.entity.y)
+        if step is None:
+            return False
+
+        MovementAction(self.entity, step[0] - self.entity.x, step[1] - self.entity.y).perform()
+        return True
+
+    def is_path_valid(self, dest_x: int, dest_y: int) -> bool:
+        """Check if the path from the last call to move_towards can still be followed to this destination."""
+        path = self.path
+        if not path or self.path_destination != (dest_x, dest_y):
+            return False
+
+        gamemap = self.entity.gamemap
+        step_x, step_y = path[0]
+
+        # We have been moved off the path somehow
+        if max(abs(step_x - self.entity.x), abs(step_y - self.entity.y)) != 1:
+            return False
+
+        # Something is in the way of the next step
+        if not gamemap.cost[step_x, step_y] or gamemap.get_blocking_entity_at_location(step_x, step_y):
+            return False
+
+        if self.path_version != gamemap.cost_version:
+            changes = gamemap.get_cost_changes_since(self.path_version)
+            if changes is None:
+                return False
+
+            # Only throw the path away if the cost of one of the tiles along it has changed
+            path_tiles = set(path)
+            for change in changes:
+                if change in path_tiles:
+                    return False
+
+            self.path_version = gamemap.cost_version
+
+        return True
+
 
 class MoveToPlayer(BaseAI):
     def __init__(self, entity: Actor):
@@ -48,13 +139,8 @@ class MoveToPlayer(BaseAI):
         dy = target.y - self.entity.y
         distance = max(abs(dx), abs(dy))  # Chebyshev distance.
 
-        self.path = self.get_path_to(target.x, target.y)
-
-        if self.path:
-            dest_x, dest_y = self.path.pop(0)
-            return MovementAction(
-                self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
-            ).perform()
+        if self.move_towards(target.x, target.y):
+            return
 
         return WaitAction(self.entity).perform()
 
@@ -87,13 +173,8 @@ class MoveAlongRoute(BaseAI):
                 self.route_index = 0
             return
 
-        self.path = self.get_path_to(self._route[self.route_index][0], self._route[self.route_index][1])
-
-        if self.path:
-            dest_x, dest_y = self.path.pop(0)
-            return MovementAction(
-                self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
-            ).perform()
+        if self.move_towards(self._route[self.route_index][0], self._route[self.route_index][1]):
+            return
 
         return WaitAction(self.entity).perform()
 
@@ -108,6 +189,10 @@ class Brother(BaseAI):
         self.current_job = None
 
         self.selected_job_location = 0
+        self.job_assigned_tick = None  # Tick the active job was handed to us, until we get to it
+
+        self.wander_target = None
+        self.wander_wait = 0
 
     def perform(self) -> None:
         """
@@ -153,25 +238,33 @@ class Brother(BaseAI):
             if distance is 0:
                 # If we are at the job location perform the job
                 # print(f"{self.entity.name} is working on a job at {self.job.location}")
+                metrics = self.engine.jobs.metrics
+                if self.is_assigned_active_job() and self.job_assigned_tick is not None:
+                    metrics.record_travel(metrics.ticks - self.job_assigned_tick)
+                    self.job_assigned_tick = None
 
+                self.entity.animal.activity = self.current_job.activity
                 self.current_job.update(self.entity)
                 if self.current_job.completed:
+                    self.entity.animal.activity = Activity.IDLE
                     print(f"Completed job + {self.current_job.name}")
                     if self.is_assigned_passive_job():
                         self.passive_job = None
                     elif self.is_assigned_active_job():
                         self.active_job = None
+                        metrics.record_completed()
 
                     self.current_job = None
                     return
             else:                # else move towards the job location
-                self.path = self.get_path_to(self.current_job.locations[self.selected_job_location][0], self.current_job.locations[self.selected_job_location][1])
+                room = self.current_job.room
+                if room is not None and not room.is_point_in_room((self.entity.x, self.entity.y)):
+                    # Everyone heading to the same room shares the room's flow field until they get there
+                    if self.follow_flow_field(self.engine.game_map.flow_fields.get_room_field(room)):
+                        return
 
-                if self.path:
-                    dest_x, dest_y = self.path.pop(0)
-                    return MovementAction(
-                        self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
-                    ).perform()
+                if self.move_towards(self.current_job.locations[self.selected_job_location][0], self.current_job.locations[self.selected_job_location][1]):
+                    return
                 else:
                     # If we can't reach where we need to be to perform this job, pick another of its work locations (not worrying about distance)
                     self.selected_job_location += 1
@@ -183,18 +276,32 @@ class Brother(BaseAI):
             self.get_next_job()
 
         if self.current_job is None:
-            if random.random() < 1.2:
-                cloister = self.engine.game_map.room_holder.get_room(RoomType.CLOISTER)
-                if cloister is not None:
-                    position = cloister.get_random_point_in_room()
-                    job = JobEffort([position], 1, name="Idle")
-                    self.engine.jobs.queue.put(job)
-                else:
-                    print("No Cloister!")
-            else:
-                job = JobEffort([[self.entity.x, self.entity.y]], 60, name="Idle")
-                self.selected_job_location = 0
-                self.job = job
+            self.wander()
+
+    def wander(self):
+        """Nothing to do, so stroll around the cloister. This is kept to ourselves rather than going on the job board,
+        so we are free to take any real job as soon as one comes up."""
+        if self.wander_wait > 0:
+            self.wander_wait -= 1
+            return
+
+        if self.wander_target is None:
+            cloister = self.engine.game_map.room_holder.get_room(RoomType.CLOISTER)
+            if cloister is None:
+                return
+
+            # Only wander to places we can get to
+            regions = self.engine.game_map.get_walkable_regions()
+            tiles = np.array(cloister.tiles)
+            tiles = tiles[regions[tiles[:, 0], tiles[:, 1]] == regions[self.entity.x, self.entity.y]]
+            if len(tiles) == 0:
+                return
+            self.wander_target = tuple(tiles[random.randrange(len(tiles))])
+
+        if (self.entity.x, self.entity.y) == tuple(self.wander_target) or not self.move_towards(self.wander_target[0], self.wander_target[1]):
+            # Got there, or can't get there, so have a rest before picking somewhere else
+            self.wander_target = None
+            self.wander_wait = random.randint(0, 10)
 
     def is_assigned_passive_job(self):
         return self.current_job is self.passive_job
@@ -202,12 +309,32 @@ class Brother(BaseAI):
     def is_assigned_active_job(self):
         return self.current_job is self.active_job
 
+    def is_resting(self) -> bool:
+        if self.current_job is None or not self.current_job.is_waiting() or not self.current_job.in_progress or self.passive_job_waiting():
+            return False
+
+        location = self.current_job.locations[self.selected_job_location]
+        return location[0] == self.entity.x and location[1] == self.entity.y
+
+    def get_wake_minute(self) -> Optional[int]:
+        return self.current_job.get_finish_minute()
+
+    def wants_job(self) -> bool:
+        return self.current_job is None and self.active_job is None and not self.passive_job_waiting()
+
+    def assign_job(self, job):
+        """Take on a job handed out by the job board."""
+        self.active_job = job
+        self.job_assigned_tick = self.engine.jobs.metrics.ticks
+
     def get_next_job(self):
         if self.passive_job_waiting():
             self.passive_job = self.entity.schedule.jobs.popleft()
 
-        if not self.engine.jobs.queue.empty() and self.active_job is None:
-            self.active_job = self.engine.jobs.queue.get()
+        if self.active_job is None and self.engine.jobs.mode is AssignmentMode.INDIVIDUAL:
+            job = self.engine.jobs.claim_job(self.entity.x, self.entity.y)
+            if job is not None:
+                self.assign_job(job)
 
         if self.passive_job is not None:
             self.current_job = self.passive_job
@@ -1,15 +1,76 @@
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+from typing import Callable, Optional, TYPE_CHECKING
+
 from components.base_component import BaseComponent
+from needs import Activity, Need, NeedThreshold
+
+if TYPE_CHECKING:
+    from needs import Needs
 
 
 class Animal (BaseComponent):
+    """An actor's health and needs. While the actor is on a map its needs live in a row of the engine's needs system,
+    and this is just a view over that row."""
+
     def __init__(self, hp: int):
         self.max_hp = hp
         self._hp = hp
 
         self.max_want_level = 100
-        self._hunger = self.max_want_level
-        self._thirst = self.max_want_level
-        self._energy = self.max_want_level
+        self.needs: Optional[Needs] = None  # Needs system holding our row, if we are on a map
+        self.row = -1
+        self.levels = np.full(len(Need), self.max_want_level, dtype=np.float64)  # Our row of the needs system, or our own copy
+        self._activity = Activity.IDLE
+
+    def attach(self, needs: Needs, row: int):
+        self.needs = needs
+        self.row = row
+        self.levels = needs.levels[row]
+
+    def detach(self, levels: np.ndarray, activity: Activity):
+        self.needs = None
+        self.row = -1
+        self.levels = levels
+        self._activity = activity
+
+    @property
+    def activity(self) -> Activity:
+        if self.needs is None:
+            return self._activity
+        return Activity(self.needs.activities[self.row])
+
+    @activity.setter
+    def activity(self, activity: Activity) -> None:
+        if self.needs is None:
+            self._activity = activity
+        else:
+            self.needs.activities[self.row] = activity
+
+    def subscribe(self, need: Need, threshold: float, above: bool, callback: Callable[[], None]) -> NeedThreshold:
+        """Call callback when the need crosses the threshold, rather than having to check on it every tick.
+        Only animals on a map can be subscribed to."""
+        return self.needs.subscribe(self, need, threshold, above, callback)
+
+    def unsubscribe(self, subscription: NeedThreshold):
+        if self.needs is not None:
+            self.needs.unsubscribe(subscription)
+
+    def get_minutes_until(self, subscription: NeedThreshold) -> Optional[int]:
+        """Minutes until the subscription's threshold is crossed if we keep doing what we're doing, or None if it won't be."""
+        if self.needs is None:
+            return None
+        return self.needs.get_minutes_until(subscription)
+
+    def get_need(self, need: Need) -> float:
+        return float(self.levels[need])
+
+    def set_need(self, need: Need, value: float):
+        self.levels[need] = max(0, min(value, self.max_want_level))
+        if self.needs is not None:
+            self.needs.publish(self.needs.check_need(self.row, need))
 
     @property
     def hp(self) -> int:
@@ -20,25 +81,25 @@ class Animal (BaseComponent):
         self._hp = max(0, min(value, self.max_hp))
 
     @property
-    def hunger(self):
-        return self._hunger
+    def hunger(self) -> float:
+        return self.get_need(Need.HUNGER)
 
     @hunger.setter
-    def hunger(self, value: int) -> None:
-        self._hunger = max(0, min(value, self.max_want_level))
+    def hunger(self, value: float) -> None:
+        self.set_need(Need.HUNGER, value)
 
     @property
-    def thirst(self):
-        return self._thirst
+    def thirst(self) -> float:
+        return self.get_need(Need.THIRST)
 
     @thirst.setter
-    def thirst(self, value: int) -> None:
-        self._hunger = max(0, min(value, self.max_want_level))
+    def thirst(self, value: float) -> None:
+        self.set_need(Need.THIRST, value)
 
     @property
-    def energy(self):
-        return self._energy
+    def energy(self) -> float:
+        return self.get_need(Need.ENERGY)
 
     @energy.setter
-    def energy(self, value: int) -> None:
-        self._energy = max(0, min(value, self.max_want_level))
+    def energy(self, value: float) -> None:
+        self.set_need(Need.ENERGY, value)
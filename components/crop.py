@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from components.plant import Plant
 
 from enum import Enum, auto
@@ -7,18 +9,19 @@ class CropType(Enum):
     NONE = auto()
     WHEAT = auto()
 
-    @classmethod
-    def get_crop_name(cls):
-        if cls is cls.NONE:
+    @staticmethod
+    def get_crop_name(crop_type: CropType):
+        if crop_type is CropType.NONE:
             return ""
-        if cls is cls.WHEAT:
+        if crop_type is CropType.WHEAT:
             return "Wheat"
 
-    @classmethod
-    def get_grow_time(cls):
-        if cls is cls.NONE:
+    @staticmethod
+    def get_grow_time(crop_type: CropType):
+        """Minutes the crop takes to grow."""
+        if crop_type is CropType.NONE:
             return 0
-        if cls is cls.WHEAT:
+        if crop_type is CropType.WHEAT:
             return 100
 
 
@@ -29,3 +32,8 @@ class Crop(Plant):
 
     def perform(self):
         pass
+
+    def plant(self, crop_type: CropType):
+        self.crop_type = crop_type
+        if crop_type is not CropType.NONE:
+            self.start_growing(CropType.get_grow_time(crop_type))
@@ -15,6 +15,10 @@ class PhysicalProperty(Action, BaseComponent):
     def perform(self):
         raise NotImplementedError()
 
+    def advance(self, minutes: int):
+        """Catch up on minutes the engine skipped over. Does nothing unless the property changes with time on its own."""
+        pass
+
     @property
     def engine(self) -> Engine:
         return self.entity.gamemap.engine
@@ -5,7 +5,30 @@ class Plant(PhysicalProperty):
     def __init__(self, entity):
         super().__init__(entity)
         self.grow_time = 0
-        self.time_elapsed = 0
+        self.planted_time = None
+        self.grown = False
+        self.timer = None
 
     def perform(self):
         pass
+
+    @property
+    def time_elapsed(self) -> int:
+        """Minutes since we were planted."""
+        if self.planted_time is None:
+            return 0
+        return self.engine.calendar.minutes - self.planted_time
+
+    def start_growing(self, grow_time: int):
+        """Start growing, having the engine's timers wake us when we are done rather than counting every tick."""
+        if self.timer is not None:
+            self.timer.cancel()
+
+        self.grow_time = grow_time
+        self.planted_time = self.engine.calendar.minutes
+        self.grown = False
+        self.timer = self.engine.timers.schedule(self.planted_time + grow_time, self.finish_growing)
+
+    def finish_growing(self):
+        self.grown = True
+        self.timer = None
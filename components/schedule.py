@@ -5,7 +5,7 @@ from typing import Iterable, Iterator, Optional, TYPE_CHECKING
 from datetime import datetime, timedelta, time
 from components.base_component import BaseComponent
 from actions import Action, GoToServiceAction, GoToMealAction, GoToBedAction
-from calendar import Calendar
+from game_calendar import Calendar
 from rooms import RoomType, Room
 from room_holder import Rooms
 
@@ -25,60 +25,135 @@ class ScheduleEvent:
         self.name = name
         self.action = action
         self.time = time
+        self.minute = time.hour * 60 + time.minute  # Minute of the day the event is at
         self.passed = False
 
 
-class BaseSchedule(BaseComponent):
-    def __init__(self, actor: Actor):
-        self.events = []
-        self.actor = actor
-        self.waiting_event = -1
-        self.event_window = timedelta(minutes=5)
-        self.jobs = collections.deque()
+class Timetable:
+    """Events that happen at the same times every day.
 
-    def update(self):
-        for event in self.events:
-            if not event.passed and self.is_time_between((event.time - self.event_window).time(), (event.time + self.event_window).time(), self.actor.gamemap.engine.calendar.date_time.time()):
+    Events are kept in a timeline sorted by the minute of the day their window opens, with a cursor pointing at
+    the next one due, so each tick only has to look at that one event. The timeline starts again at midnight.
+    """
+
+    def __init__(self):
+        self.events = []  # Events sorted by the minute of the day they are at
+        self.event_window = timedelta(minutes=5)
+        self.cursor = 0  # Index into events of the next event due
+        self.day = None  # Day the timeline was last run for
+        self.last_minute = 0  # Minute of the day the timeline was last run up to
+
+    def update(self, calendar: Calendar):
+        day = calendar.get_day()
+        minute = calendar.get_minute_of_day()
+        if day != self.day:
+            # The first time we run, anything earlier in the day has already been missed
+            self.last_minute = minute if self.day is None else 0
+            self.reset()
+            self.day = day
+
+        # Fire every event whose window was open at some point since we last ran, however far time has moved on
+        window = int(self.event_window.total_seconds() // 60)
+        while self.cursor < len(self.events) and self.get_open_minute(self.events[self.cursor]) <= minute:
+            event = self.events[self.cursor]
+            self.cursor += 1
+
+            if not event.passed and event.minute + window >= self.last_minute:
                 event.passed = True
                 if event.action is not None:
                     event.action.perform()
 
-    def reset(self):
-        for event in self.events:
-            event.completed = False
+        self.last_minute = minute
 
-    def setup_schedule(self):
-        pass
+    def get_next_minute(self, calendar: Calendar) -> Optional[int]:
+        """Calendar minute at which the next event's window opens, or None if there are no events."""
+        if not self.events:
+            return None
 
-    def add_event(self, name: str, job: Job, time: time):
-        self.events.append(ScheduleEvent(name, job, time))
+        if self.day != calendar.get_day():
+            return calendar.get_minutes()
 
-    def get_waiting_event(self):
-        if self.waiting_event is not -1:
-            return self.events[self.waiting_event]
-            self.waiting_event = -1
+        if self.cursor < len(self.events):
+            minute = calendar.get_day() * calendar.MINUTES_PER_DAY + self.get_open_minute(self.events[self.cursor])
         else:
-            return None
+            minute = (calendar.get_day() + 1) * calendar.MINUTES_PER_DAY + self.get_open_minute(self.events[0])
+
+        return max(minute, calendar.get_minutes())
+
+    def reset(self):
+        for event in self.events:
+            event.passed = False
+        self.cursor = 0
+
+    def get_open_minute(self, event: ScheduleEvent) -> int:
+        """Minute of the day the event's window opens. Windows don't reach back past midnight into the previous day."""
+        return max(0, event.minute - int(self.event_window.total_seconds() // 60))
 
-    def is_time_between(self, begin_time, end_time, check_time):
-        if begin_time < end_time:
-            return check_time >= begin_time and check_time <= end_time
-        else:  # crosses midnight
-            return check_time >= begin_time or check_time <= end_time
+    def add_event(self, name: str, action: Action, time: time):
+        self.events.append(ScheduleEvent(name, action, time))
+        self.events.sort(key=lambda event: event.minute)
+        self.cursor = 0
 
 
-class BrotherSchedule(BaseSchedule):
+class BaseSchedule(BaseComponent):
+    """An actor's own timetable, along with the jobs it has handed them that they haven't got to yet."""
+
     def __init__(self, actor: Actor):
-        super().__init__(actor)
-
-        self.add_event("Vigil", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=2))
-        self.add_event("Lauds", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=3))
-        self.add_event("Lauds", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=5))
-        self.add_event("Prime", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=6))
-        self.add_event("Terce", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=9))
-        self.add_event("Sext", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=12))
-        self.add_event("Lunch", GoToMealAction(actor), datetime(1, 1, 1, hour=13))
-        self.add_event("Nones", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=15))
-        self.add_event("Vespers", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=18))
-        self.add_event("Compline", GoToServiceAction(actor, timedelta(minutes=30)), datetime(1, 1, 1, hour=19))
-        self.add_event("Bedtime", GoToBedAction(actor), datetime(1, 1, 1, hour=20))
+        self.actor = actor
+        self.timetable = Timetable()
+        self.jobs = collections.deque()
+
+    def update(self):
+        if self.timetable.events:
+            self.timetable.update(self.actor.gamemap.engine.calendar)
+
+    def add_event(self, name: str, action: Action, time: time):
+        self.timetable.add_event(name, action, time)
+
+    def get_next_minute(self) -> Optional[int]:
+        return self.timetable.get_next_minute(self.actor.gamemap.engine.calendar)
+
+
+class Horarium:
+    """The monastery's daily round of services, meals and sleep, shared by every brother enrolled in it.
+    Each event fires once for the whole community rather than once per brother."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.timetable = Timetable()
+        self.brothers = list()
+        self.timer = None
+
+        player = engine.player
+        self.timetable.add_event("Vigil", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=2))
+        self.timetable.add_event("Lauds", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=3))
+        self.timetable.add_event("Lauds", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=5))
+        self.timetable.add_event("Prime", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=6))
+        self.timetable.add_event("Terce", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=9))
+        self.timetable.add_event("Sext", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=12))
+        self.timetable.add_event("Lunch", GoToMealAction(player, self.brothers), datetime(1, 1, 1, hour=13))
+        self.timetable.add_event("Nones", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=15))
+        self.timetable.add_event("Vespers", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=18))
+        self.timetable.add_event("Compline", GoToServiceAction(player, self.brothers, timedelta(minutes=30)), datetime(1, 1, 1, hour=19))
+        self.timetable.add_event("Bedtime", GoToBedAction(player, self.brothers), datetime(1, 1, 1, hour=20))
+
+        self.start()
+
+    def enrol(self, brother: Actor):
+        self.brothers.append(brother)
+
+    def leave(self, brother: Actor):
+        if brother in self.brothers:
+            self.brothers.remove(brother)
+
+    def get_next_minute(self) -> Optional[int]:
+        """Calendar minute the next event's window opens."""
+        return self.timetable.get_next_minute(self.engine.calendar)
+
+    def start(self):
+        """Start waking up for each event in turn."""
+        self.timer = self.engine.timers.schedule(self.get_next_minute(), self.wake)
+
+    def wake(self):
+        self.timetable.update(self.engine.calendar)
+        self.start()
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 from tcod.console import Console
 
+import colours
+
 from actions import EscapeAction, MovementAction
 from input_handlers import MainGameEventHandler
 from message_log import MessageLog
 from jobs import Jobs
-from calendar import Calendar
+from game_calendar import Calendar
+from timers import TimerWheel
+from needs import Needs
 from monastery import Monastery
 from ui import UI
 from game_map import GameMap
@@ -26,15 +30,17 @@ if TYPE_CHECKING:
 class Engine:
     game_map: GameMap
 
-    def __init__(self, player: Actor, map_width, map_height):
-        """ Setting up all the systems that will run during the game. These systems depend on each other so order is very important! """
+    def __init__(self, player: Actor, map_width, map_height, seed: Optional[int] = None, raster_voronoi: bool = False):
+        """ Setting up all the systems that will run during the game. These systems depend on each other so order is very important!
+        The same seed always generates the same landscape. raster_voronoi picks the grid based voronoi for big maps. """
         self.player = player
+        self.needs = Needs()
         self.game_map = GameMap(self, map_width, map_height)
         self.player.place(0, 0, self.game_map)
         self.map_height = map_height
         self.map_width = map_width
         self.jobs = Jobs(self)
-        generate_landscape(self, self.game_map, map_width, map_height)
+        generate_landscape(self, self.game_map, map_width, map_height, seed, raster_voronoi)
         self.event_handler: EventHandler = MainGameEventHandler(self)
         self.message_log = MessageLog()
         self.map_x_offset = 5
@@ -42,20 +48,24 @@ class Engine:
         self.map_mouse_location = (0, 0)
         self.mouse_location = (0, 0)
         self.calendar = Calendar(self)
+        self.timers = TimerWheel(self.calendar.minutes)
         self.monastery = Monastery(self)
         self.ui = UI(self)
+        self.skip_time = True  # Jump over stretches of time where every actor is just waiting
+        self.max_skip_minutes = Calendar.MINUTES_PER_DAY
 
     def render(self, console: Console) -> None:
         """ Renders the game to console. """
-        console.tiles_rgb[self.map_x_offset: self.map_width + self.map_x_offset, self.map_y_offset: self.map_height + self.map_y_offset] = self.game_map.tiles["graphic"]
+        map_tiles = console.tiles_rgb[self.map_x_offset: self.map_width + self.map_x_offset, self.map_y_offset: self.map_height + self.map_y_offset]
+        map_tiles[...] = self.game_map.tiles["graphic"]
+        map_tiles["bg"] = self.game_map.get_bg_colours()
 
-        entity_console = Console(console.width, console.height)
-        for entity in self.game_map.entities_sorted_for_rendering:
-            x = entity.x + self.map_x_offset
-            y = entity.y + self.map_y_offset
+        # Mark the tiles that blueprints are still waiting to build on
+        pending = self.game_map.pending_build > 0
+        map_tiles["ch"][pending] = ord(".")
+        map_tiles["fg"][pending] = colours.WHITE
 
-            entity_console.print(x=x, y=y, string=entity.char, fg=entity.fg_colour, bg=self.game_map.get_tile_bg_colour(entity.x, entity.y))
-            entity_console.blit(console, src_x=x, dest_x=x, src_y=y, dest_y=y, width=1, height=1)
+        self.game_map.render_batch.render(console, self.map_x_offset, self.map_y_offset)
 
         self.message_log.render(console=console, x=0, y=self.map_height + self.map_y_offset + 2, width=40, height=10)
         self.calendar.render(console)
@@ -63,11 +73,57 @@ class Engine:
 
     def update(self):
         """ Engine update tick """
+        if self.skip_time:
+            self.skip_resting_time()
+
         self.calendar.update()
+        self.timers.advance_to(self.calendar.minutes)
+        self.needs.update(self.calendar.tick_minutes)
         self.game_map.update()
+        self.jobs.update(self.game_map.actors)
         for entity in self.game_map.entities - {self.player}:
             entity.update()
 
+    def skip_resting_time(self):
+        """If every actor is just waiting for something to happen, jump the calendar to just before the next thing does,
+        so that the next tick lands on it."""
+        wake_minute = self.get_wake_minute()
+        if wake_minute is None:
+            return
+
+        minutes = min(wake_minute - self.calendar.minutes, self.max_skip_minutes) - self.calendar.tick_minutes
+        if minutes > 0:
+            self.advance_time(minutes)
+
+    def get_wake_minute(self) -> Optional[int]:
+        """Calendar minute the next thing happens at, or None if something could happen on any tick."""
+        actors = [actor for actor in self.game_map.actors if actor is not self.player]
+        if not actors:
+            return None
+
+        wake_minutes = []
+        for actor in actors:
+            if not actor.ai.is_resting():
+                return None
+            wake_minutes.append(actor.ai.get_wake_minute())
+            if actor.schedule:
+                wake_minutes.append(actor.schedule.get_next_minute())
+
+        # Only look through the timers once we know everyone is resting, since someone usually isn't
+        wake_minutes.append(self.timers.get_next_minute())
+
+        wake_minutes = [minute for minute in wake_minutes if minute is not None]
+        return min(wake_minutes) if wake_minutes else self.calendar.minutes + self.max_skip_minutes
+
+    def advance_time(self, minutes: int):
+        """Move time on by minutes without ticking, applying what would have happened over that time in one go."""
+        self.calendar.advance(minutes)
+        self.timers.advance_to(self.calendar.minutes)
+        self.needs.update(minutes)
+        self.jobs.metrics.add_hours(minutes / 60)
+        for entity in self.game_map.entities - {self.player}:
+            entity.advance(minutes)
+
     def is_mouse_in_map(self) -> bool:
         """ Is the mouse inside the bounds of the map """
         # This should perhaps move
@@ -66,7 +66,7 @@ class Entity:
         if gamemap:
             # If gamemap isn't provided now then it will be set later.
             self.gamemap = gamemap
-            gamemap.entities.add(self)
+            gamemap.add_entity(self)
 
         self.physical_properties = []
         for component in physical_properties:
@@ -78,7 +78,7 @@ class Entity:
         clone.x = x
         clone.y = y
         clone.gamemap = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
 
         return clone
 
@@ -92,23 +92,73 @@ class Entity:
 
     def move(self, dx: int, dy: int) -> None:
         # Move the entity by a given amount
+        old_x, old_y = self.x, self.y
         self.x += dx
         self.y += dy
+        if hasattr(self, "gamemap"):
+            self.gamemap.move_entity(self, old_x, old_y)
 
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
         """Place this entitiy at a new location.  Handles moving across GameMaps."""
-        self.x = x
-        self.y = y
         if gamemap:
             if hasattr(self, "gamemap"):  # Possibly uninitialized.
-                self.gamemap.entities.remove(self)
+                self.gamemap.remove_entity(self)
+            self.x = x
+            self.y = y
             self.gamemap = gamemap
-            gamemap.entities.add(self)
+            gamemap.add_entity(self)
+        else:
+            old_x, old_y = self.x, self.y
+            self.x = x
+            self.y = y
+            if hasattr(self, "gamemap"):
+                self.gamemap.move_entity(self, old_x, old_y)
+
+    @property
+    def char(self) -> str:
+        return self._char
+
+    @char.setter
+    def char(self, char: str) -> None:
+        self._char = char
+        self.refresh_glyph()
+
+    @property
+    def fg_colour(self) -> Tuple[int, int, int]:
+        return self._fg_colour
+
+    @fg_colour.setter
+    def fg_colour(self, fg_colour: Tuple[int, int, int]) -> None:
+        self._fg_colour = fg_colour
+        self.refresh_glyph()
+
+    def refresh_glyph(self) -> None:
+        """Let the map know our glyph has changed so it is redrawn, if we are on one."""
+        if hasattr(self, "gamemap") and self in self.gamemap.entity_index.entities:
+            self.gamemap.refresh_glyph(self.x, self.y)
+
+    @property
+    def render_order(self) -> RenderOrder:
+        return self._render_order
+
+    @render_order.setter
+    def render_order(self, render_order: RenderOrder) -> None:
+        old_render_order = getattr(self, "_render_order", None)
+        self._render_order = render_order
+
+        # Let the map know so the entity is drawn in its new layer
+        if old_render_order is not None and old_render_order is not render_order and hasattr(self, "gamemap"):
+            self.gamemap.change_render_order(self, old_render_order)
 
     def update(self):
         for component in self.physical_properties:
             component.perform()
 
+    def advance(self, minutes: int):
+        """Pass minutes the engine skipped over on to each physical property, needs are caught up by the Needs system."""
+        for component in self.physical_properties:
+            component.advance(minutes)
+
     def is_type(self, id: entity_factories.EntityID):
         return self.id is id
 
@@ -206,6 +256,7 @@ class Prop(Entity):
 
         if self.colours_bg:
             clone.bg_colour = colours.colour_lerp(clone.bg_colour, (max(0, clone.bg_colour[0] - 30), max(0, clone.bg_colour[1] - 30), max(0, clone.bg_colour[2] - 30)), max(0.4, random.random()))
+            gamemap.refresh_bg_colour(x, y)
 
         return clone
 
@@ -3,7 +3,7 @@
 from components.ai import MoveToPlayer
 from components.ai import Brother
 from components.animal import Animal
-from components.schedule import BrotherSchedule, BaseSchedule
+from components.schedule import BaseSchedule
 from components.crop import Crop
 
 from entity import Actor
@@ -28,7 +28,7 @@ brother = Actor(
     fg_colour=(63, 127, 63),
     name="Brother",
     ai_cls=Brother,
-    schedule_cls=BrotherSchedule,
+    schedule_cls=BaseSchedule,
     animal=Animal(hp=10),
     weight=90,
 )
@@ -65,15 +65,6 @@ cloister_grass = Prop(
     colours_bg=False
 )
 
-pending_job = Prop(
-    id=EntityID.PENDING_JOB,
-    char=".",
-    fg_colour=colours.WHITE,
-    name="Pending Job",
-    weight=0,
-    blocks_movement=False,
-)
-
 door = Prop(
     id=EntityID.DOOR,
     char="∩",
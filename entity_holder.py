@@ -13,14 +13,40 @@ if TYPE_CHECKING:
 class EntityHolder():
     def __init__(self):
         self.entities = set()
+        # Tile -> entities standing on it, kept up to date as entities are added, moved and removed
+        self.locations = dict()
+
+    def add_entity(self, entity: Entity):
+        self.entities.add(entity)
+        self.locations.setdefault((entity.x, entity.y), []).append(entity)
+
+    def remove_entity(self, entity: Entity):
+        if entity not in self.entities:
+            return
+
+        self.entities.remove(entity)
+        self.remove_from_location(entity, entity.x, entity.y)
+
+    def move_entity(self, entity: Entity, old_x: int, old_y: int):
+        """Re-index an entity that has moved from (old_x, old_y) to its current position."""
+        if entity not in self.entities:
+            return
+
+        self.remove_from_location(entity, old_x, old_y)
+        self.locations.setdefault((entity.x, entity.y), []).append(entity)
+
+    def remove_from_location(self, entity: Entity, x: int, y: int):
+        location = self.locations.get((x, y))
+        if location is None:
+            return
+
+        location.remove(entity)
+        if not location:
+            del self.locations[(x, y)]
 
     def get_blocking_entity_at_location(self, location_x: int, location_y: int,) -> Optional[Entity]:
-        for entity in self.entities:
-            if (
-                entity.blocks_movement
-                and entity.x == location_x
-                and entity.y == location_y
-            ):
+        for entity in self.locations.get((location_x, location_y), ()):
+            if entity.blocks_movement:
                 return entity
 
         return None
@@ -35,12 +61,4 @@ class EntityHolder():
         return entities
 
     def get_entities_at_location(self, x: int, y: int) -> list(Entity):
-        entities = list()
-        for entity in self.entities:
-            if entity.x == x and entity.y == y:
-                entities.append(entity)
-
-        return entities
-
-    def remove_entity(self, entity: Entity):
-        entities.remove(entity)
+        return list(self.locations.get((x, y), ()))
@@ -5,31 +5,40 @@ import numpy as np  # type: ignore
 from typing import Iterable, Iterator, Optional, TYPE_CHECKING, Tuple
 from entity_holder import EntityHolder
 from rooms import Room, RoomType
-from actions import CreatePropAction, RemovePendingJobAction
-from jobs import JobEffort
+from blueprints import Blueprint, BlueprintKind
 from components.crop import Crop, CropType
 
 import tcod
 import queue
 import random
-import entity_factories
 
 
 class Farm(Room):
-    def __init__(self, landscape: GameMap, tiles):
+    def __init__(self, landscape: GameMap, tiles, crop_type: CropType = CropType.NONE):
         super().__init__(landscape, RoomType.FARM, tiles)
-        self.crop_type = CropType.NONE
+        self.crop_type = crop_type
 
-        # Create a job to create the farm field that immediately spawns a "pending job entity"
-        for tile in tiles:
-            instant_action = CreatePropAction(self.landscape.engine.player, entity_factories.pending_job, [tile[0], tile[1]])
-            completion_action = [CreatePropAction(self.landscape.engine.player, entity_factories.field, [tile[0], tile[1]]), RemovePendingJobAction(self.landscape.engine.player, [tile[0], tile[1]])]
-            job = JobEffort([tile[0], tile[1]], 1, instantAction=instant_action, completionAction=completion_action, name="Create Field")
-            self.landscape.engine.jobs.queue.put(job)
+        # Plough the whole farm as one blueprint, sowing each field as soon as it is made
+        blueprint = Blueprint(self.landscape.engine, tiles, np.full(len(tiles), BlueprintKind.FIELD), on_cell_complete=self.add_field)
+        self.landscape.engine.jobs.add_blueprint(blueprint)
 
     def set_crop(self, crop_type: CropType):
         self.crop_type = crop_type
 
+        # Sow every field that has been made so far, later ones are sown by add_field
+        for tile in self.tiles:
+            self.sow(tile[0], tile[1])
+
+    def add_field(self, x: int, y: int, kind: BlueprintKind = BlueprintKind.FIELD):
+        if kind is BlueprintKind.FIELD:
+            self.sow(x, y)
+
+    def sow(self, x: int, y: int):
+        for entity in self.landscape.get_entities_at_location(x, y):
+            for physical_property in entity.physical_properties:
+                if isinstance(physical_property, Crop):
+                    physical_property.plant(self.crop_type)
+
     def get_room_name(self):
         if self.crop_type is CropType.NONE:
             return "Empty Farm"
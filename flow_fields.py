@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+from typing import Dict, Hashable, Iterable, Optional, Tuple, TYPE_CHECKING
+
+import tcod
+
+if TYPE_CHECKING:
+    from game_map import GameMap
+    from rooms import Room
+
+
+class FlowField:
+    """Distance from every tile on the map to the nearest of a set of target tiles.
+    Any number of actors can walk towards the targets by stepping downhill, without searching for a path themselves.
+
+    Stepping downhill still reaches a target after tile costs have drifted, as long as no tile has been blocked or
+    unblocked, so cost changes like wear and crowding only trigger a rebuild once max_cost_drift of them have built up.
+    """
+
+    def __init__(self, gamemap: GameMap, targets: Iterable[Tuple[int, int]], max_cost_drift: int = 512):
+        self.gamemap = gamemap
+        self.targets = [(int(target[0]), int(target[1])) for target in targets]
+        self.max_cost_drift = max_cost_drift
+        self.distance = None
+        self.version = -1
+        self.passable_version = -1
+
+    def rebuild(self):
+        """Run a dijkstra search outwards from all the targets at once."""
+        pathfinder = tcod.path.Pathfinder(self.gamemap.graph)
+
+        # Don't start from tiles that can't be stood on, unless there is nowhere else to start from
+        roots = [target for target in self.targets if self.gamemap.cost[target[0], target[1]]]
+        if not roots:
+            roots = self.targets
+
+        for root in roots:
+            pathfinder.add_root(root)
+
+        pathfinder.resolve()
+
+        self.distance = pathfinder.distance.copy()
+        self.unreachable = np.iinfo(self.distance.dtype).max
+        self.version = self.gamemap.cost_version
+        self.passable_version = self.gamemap.passable_version
+
+    def is_stale(self) -> bool:
+        return (
+            self.passable_version != self.gamemap.passable_version
+            or self.gamemap.cost_version - self.version > self.max_cost_drift
+        )
+
+    def get_distance(self, x: int, y: int) -> Optional[int]:
+        """Return the distance from this tile to the nearest target, or None if no target can be reached from it."""
+        distance = self.distance[x, y]
+        if distance == self.unreachable:
+            return None
+
+        return int(distance)
+
+    def get_next_step(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Return the neighbouring tile that gets closest to a target, or None if we are there or stuck."""
+        best_step = None
+        best_distance = self.distance[x, y]
+
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                step_x, step_y = x + dx, y + dy
+                if (dx == 0 and dy == 0) or not self.gamemap.in_bounds(step_x, step_y):
+                    continue
+
+                if self.distance[step_x, step_y] < best_distance and self.gamemap.cost[step_x, step_y]:
+                    best_step = (step_x, step_y)
+                    best_distance = self.distance[step_x, step_y]
+
+        return best_step
+
+
+class FlowFields:
+    """Flow fields shared between all the actors on a map, keyed by room or by any set of target tiles.
+    Fields are only rebuilt when they are asked for after the map's cost grid has changed enough to matter."""
+
+    def __init__(self, gamemap: GameMap):
+        self.gamemap = gamemap
+        self.fields: Dict[Hashable, FlowField] = dict()
+
+    def get_field(self, key: Hashable, targets: Iterable[Tuple[int, int]]) -> FlowField:
+        field = self.fields.get(key)
+        if field is None:
+            field = FlowField(self.gamemap, targets)
+            self.fields[key] = field
+
+        if field.is_stale():
+            field.rebuild()
+
+        return field
+
+    def get_room_field(self, room: Room) -> FlowField:
+        return self.get_field(room, room.tiles)
+
+    def get_tiles_field(self, tiles: Iterable[Tuple[int, int]]) -> FlowField:
+        tiles = frozenset((int(tile[0]), int(tile[1])) for tile in tiles)
+        return self.get_field(tiles, tiles)
+
+    def remove_field(self, key: Hashable):
+        self.fields.pop(key, None)
@@ -0,0 +1,85 @@
+
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from tcod.console import Console
+from render_functions import render_message_box
+from actions import Action, CreateJobAction
+from room_holder import Rooms
+from datetime import datetime, timedelta
+
+from entity import Actor
+import tcod
+import queue
+import jobs
+import random
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from entity import Entity
+
+
+class Calendar:
+    """
+    Class for representing the passage of time.
+
+    Time is broken down in month -> day -> time
+
+    Time is kept as a count of minutes since midnight on the day the game starts, along with the day and minute of
+    the day worked out from it, so the rest of the game can ask what the time is without any datetime arithmetic.
+    The datetime is only built when it is needed for showing the date.
+    """
+
+    MINUTES_PER_DAY = 24 * 60
+
+    def __init__(self, engine: Engine, tick_minutes: int = 1):
+        self.engine = engine
+        self.start_date = datetime(year=600, month=1, day=1)
+        self.tick_minutes = tick_minutes  # Minutes that pass each update
+        self.minutes = 0
+        self.day = 0
+        self.minute_of_day = 0
+        self.date_time = None  # Built lazily from minutes
+        self.date_time_minutes = -1
+
+        self.advance(12 * 60)
+
+    def update(self):
+        self.advance(self.tick_minutes)
+
+    def advance(self, minutes: int):
+        self.minutes += minutes
+        self.day, self.minute_of_day = divmod(self.minutes, Calendar.MINUTES_PER_DAY)
+
+    def render(self, console: Console):
+        console.print(x=3, y=1, string=self.get_current_date_time().strftime("%A, %d. %B %Y %I:%M%p"))
+
+    def get_current_date_time(self) -> datetime:
+        if self.date_time_minutes != self.minutes:
+            self.date_time = self.start_date + timedelta(minutes=self.minutes)
+            self.date_time_minutes = self.minutes
+        return self.date_time
+
+    def get_minutes(self) -> int:
+        return self.minutes
+
+    def get_day(self) -> int:
+        return self.day
+
+    def get_minute_of_day(self) -> int:
+        return self.minute_of_day
+
+        """
+        for event in self.events:
+            if self.hour is event[2][0] and event[2][1] <= self.minute <= event[2][1] + 20:
+                render_message_box(console, event[0])
+            if self.hour is event[2][0] and self.minute is event[2][1]:
+                for i in range(0, 6):
+                    room = self.engine.game_map.room_holder.get_room(event[1])
+                    if room is not None:
+                        position = room.get_random_point_in_room()
+                        job = jobs.Job([position], 30, None, None, None, event[0])
+                        self.engine.jobs.queue.put(job)
+        """
@@ -3,14 +3,20 @@ from __future__ import annotations
 import numpy as np  # type: ignore
 import tile_types
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from typing import Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
 from tcod.console import Console
 
-from entity import Actor, Prop
+from entity import Actor, EntityID, Prop
 from entity_holder import EntityHolder
+from flow_fields import FlowFields
+from render_functions import EntityRenderBatch
+from render_order import RenderOrder
 from enum import auto, Enum
 from room_holder import Rooms
+import utility
 from utility import Neighbourhood
+import collections
+import scipy.ndimage
 import tcod
 
 if TYPE_CHECKING:
@@ -18,39 +24,193 @@ if TYPE_CHECKING:
     from entity import Entity
 
 
+# Wall glyph for each neighbour mask, i.e. for which sides of a wall have walls next to them (see utility.NORTH etc.)
+WALL_GLYPHS = (
+    "║", "║", "═", "╚",  # None, N, E, N+E
+    "║", "║", "╔", "╠",  # S, N+S, E+S, N+E+S
+    "═", "╝", "═", "╩",  # W, N+W, E+W, N+E+W
+    "╗", "╣", "╦", "╬",  # S+W, N+S+W, E+S+W, N+E+S+W
+)
+
+
+class CostWeights:
+    """Weights used when composing the movement cost grid from the map's layers."""
+
+    def __init__(self, base: int = 1, tile: int = 1, wear: float = 2, actor: int = 10):
+        self.base = base  # Cost of walking over any walkable tile
+        self.tile = tile  # Multiplier for the tile's own "cost" field, e.g. the margins around buildings
+        self.wear = wear  # Extra cost of an unworn tile, worn paths are cheaper to walk
+        self.actor = actor  # Extra cost for each blocking actor on a tile
+
+
 class GameMap:
-    def __init__(self, engine: Engine, width: int, height: int):
+    def __init__(self, engine: Engine, width: int, height: int, cost_weights: Optional[CostWeights] = None):
         self.engine = engine
         self.width, self.height = width, height
         self.entity_holder = EntityHolder()
+        # Index of every entity on the map, including the ones held by rooms, for per-tile lookups
+        self.entity_index = EntityHolder()
+        # Entities split up by render order so they can be drawn in order without sorting. Dicts are used as ordered sets
+        self.render_layers = {render_order: dict() for render_order in RenderOrder}
+        # Glyph of the top entity on every occupied tile, ready to be drawn
+        self.render_batch = EntityRenderBatch()
         self.tiles = np.full((width, height), fill_value=tile_types.floor, order="F")
+        # Background colours of tiles covered by props that colour the background, e.g. walls and stone floors
+        self.bg_override = np.zeros((width, height, 3), dtype=np.uint8, order="F")
+        self.bg_override_mask = np.zeros((width, height), dtype=np.bool_, order="F")
+        # Tiles with a wall on them, used to pick wall glyphs
+        self.walls = np.zeros((width, height), dtype=np.bool_, order="F")
+        # Number of blueprints waiting to build something on each tile
+        self.pending_build = np.zeros((width, height), dtype=np.int16, order="F")
         self.cost = None
+        self.cost_weights = cost_weights if cost_weights is not None else CostWeights()
+        self.cost_version = 0  # Bumped every time the cost grid changes, so pathfinding can tell when it is stale
+        self.cost_rebuild_version = 0  # Version of the last time the whole grid changed at once
+        self.cost_changes = collections.deque(maxlen=1024)  # Recent (version, x, y) single tile changes
+        self.passable_version = 0  # Only bumped when a tile changes between walkable and blocked
+        self.walkable_regions = None
+        self.walkable_regions_version = -1
         self.room_holder = Rooms(self)
+        self.flow_fields = FlowFields(self)
 
     def update(self):
-        self.cost = np.array(self.tiles["walkable"], dtype=np.int8)
-
-        """ Very expensive!
-        for x in range(0, self.width):
-            for y in range(0, self.height):
-                self.cost[x, y] += self.tiles[x, y]["cost"]
-        """
-        for entity in self.entity_holder.entities:
-            # Check that an enitiy blocks movement and the cost isn't zero (blocking.)
-            if entity.blocks_movement and self.cost[entity.x, entity.y]:
-                # Add to the cost of a blocked position.
-                # A lower number means more enemies will crowd behind each other in
-                # hallways.  A higher number means enemies will take longer paths in
-                # order to surround the player.
+        if self.cost is None:
+            self.build_cost()
+
+    def build_cost(self):
+        """Build the movement cost grid and the graph used for pathfinding from scratch.
+        After this the grid is kept up to date one tile at a time by refresh_cost."""
+        self.blocking_actors = np.zeros((self.width, self.height), dtype=np.int32, order="F")
+        self.blocking_props = np.zeros((self.width, self.height), dtype=np.int32, order="F")
+        for entity in self.entity_index.entities:
+            if entity.blocks_movement:
                 if isinstance(entity, Actor):
-                    self.cost[entity.x, entity.y] += 10
-                if isinstance(entity, Prop):
-                    self.cost[entity.x, entity.y] += 1000
+                    self.blocking_actors[entity.x, entity.y] += 1
+                elif isinstance(entity, Prop):
+                    self.blocking_props[entity.x, entity.y] += 1
+
+        self.cost = self.compose_cost(np.s_[:, :])
 
+        # The graph keeps a reference to the cost array so in place updates are seen by new pathfinders
         self.graph = tcod.path.SimpleGraph(cost=self.cost, cardinal=2, diagonal=3)
+        self.cost_version += 1
+        self.cost_rebuild_version = self.cost_version
+        self.passable_version += 1
+
+    def compose_cost(self, region) -> np.ndarray:
+        """Compose the movement cost of a region of the map from the tile and blocking entity layers.
+        Worn tiles are cheaper to walk over, so paths form where brothers walk the most."""
+        tiles = self.tiles[region]
+        weights = self.cost_weights
+
+        cost = (
+            weights.base
+            + weights.tile * tiles["cost"]
+            + np.rint(weights.wear * tiles["wear"]).astype(np.int32)
+            # A lower number means more enemies will crowd behind each other in
+            # hallways.  A higher number means enemies will take longer paths in
+            # order to surround the player.
+            + weights.actor * self.blocking_actors[region]
+        )
+
+        # Walls and blocking props can't be walked through at all
+        cost[~tiles["walkable"] | (self.blocking_props[region] > 0)] = 0
 
-    def add_entity(self, entity: Entity):
-        self.entity_holder.entities.add(entity)
+        return cost.astype(np.int32)
+
+    def set_cost_weights(self, cost_weights: CostWeights):
+        self.cost_weights = cost_weights
+        if self.cost is not None:
+            self.cost[...] = self.compose_cost(np.s_[:, :])
+            self.cost_version += 1
+            self.cost_rebuild_version = self.cost_version
+            self.passable_version += 1
+
+    def refresh_cost(self, x: int, y: int):
+        """Recalculate the cost of a tile after something on it has changed, bumping the cost version if it did."""
+        if self.cost is None:
+            return
+
+        self.blocking_actors[x, y] = 0
+        self.blocking_props[x, y] = 0
+        for entity in self.entity_index.locations.get((x, y), ()):
+            if entity.blocks_movement:
+                if isinstance(entity, Actor):
+                    self.blocking_actors[x, y] += 1
+                elif isinstance(entity, Prop):
+                    self.blocking_props[x, y] += 1
+
+        cost = self.compose_cost(np.s_[x:x + 1, y:y + 1])[0, 0]
+        if self.cost[x, y] != cost:
+            if not self.cost[x, y] or not cost:
+                self.passable_version += 1
+
+            self.cost[x, y] = cost
+            self.cost_version += 1
+            self.cost_changes.append((self.cost_version, x, y))
+
+    def get_walkable_regions(self) -> np.ndarray:
+        """Label the areas of the map that can be walked between, tiles that can't be walked on are 0.
+        Only relabelled when a tile has been blocked or unblocked since the last call."""
+        if self.cost is None:
+            self.build_cost()
+
+        if self.walkable_regions_version != self.passable_version:
+            self.walkable_regions, _ = scipy.ndimage.label(self.cost > 0, structure=np.ones((3, 3)))
+            self.walkable_regions_version = self.passable_version
+
+        return self.walkable_regions
+
+    def get_cost_changes_since(self, version: int) -> Optional[List[Tuple[int, int]]]:
+        """Return the tiles whose cost has changed since the given cost version.
+        Returns None if that is no longer known, e.g. the whole grid has been rebuilt since."""
+        if version < self.cost_rebuild_version:
+            return None
+
+        changes = list()
+        for change_version, x, y in reversed(self.cost_changes):
+            if change_version <= version:
+                return changes
+            changes.append((x, y))
+
+        # Ran out of history before reaching the version asked about
+        if len(self.cost_changes) == self.cost_changes.maxlen:
+            return None
+
+        return changes
+
+    def add_entity(self, entity: Entity, entity_holder: Optional[EntityHolder] = None):
+        if entity_holder is None:
+            entity_holder = self.entity_holder
+
+        entity.entity_holder = entity_holder
+        entity_holder.add_entity(entity)
+        self.entity_index.add_entity(entity)
+        self.render_layers[entity.render_order][entity] = None
+        self.refresh_glyph(entity.x, entity.y)
+        self.refresh_cost(entity.x, entity.y)
+        if entity.colours_bg:
+            self.refresh_bg_colour(entity.x, entity.y)
+        if entity.is_type(EntityID.WALL):
+            self.walls[entity.x, entity.y] = True
+        if isinstance(entity, Actor):
+            self.engine.needs.add(entity.animal)
+
+    def move_entity(self, entity: Entity, old_x: int, old_y: int):
+        """Keep the location indexes up to date after an entity has changed position."""
+        entity.entity_holder.move_entity(entity, old_x, old_y)
+        self.entity_index.move_entity(entity, old_x, old_y)
+        self.refresh_glyph(old_x, old_y)
+        self.refresh_glyph(entity.x, entity.y)
+        if entity.blocks_movement:
+            self.refresh_cost(old_x, old_y)
+            self.refresh_cost(entity.x, entity.y)
+        if entity.colours_bg:
+            self.refresh_bg_colour(old_x, old_y)
+            self.refresh_bg_colour(entity.x, entity.y)
+        if entity.is_type(EntityID.WALL):
+            self.refresh_wall(old_x, old_y)
+            self.walls[entity.x, entity.y] = True
 
     def in_bounds(self, x: int, y: int) -> bool:
         """Return True if x and y are inside of the bounds of this map."""
@@ -66,29 +226,59 @@ class GameMap:
 
     @property
     def all_entities(self):
-        all_entities = set()
-        for entity in self.entities:
-            all_entities.add(entity)
-
-        for room in self.rooms:
-            for entity in room.entities:
-                all_entities.add(entity)
-
-        return all_entities
+        """Every entity on the map, including the ones held by rooms."""
+        return self.entity_index.entities
 
     @property
     def entities_sorted_for_rendering(self):
-        return sorted(self.all_entities, key=lambda x: x.render_order.value)
+        """Iterate over every entity on the map, lowest render order first."""
+        for render_order in RenderOrder:
+            yield from self.render_layers[render_order]
+
+    def change_render_order(self, entity: Entity, old_render_order: RenderOrder):
+        """Move an entity to the render layer for its new render order."""
+        if entity in self.render_layers[old_render_order]:
+            del self.render_layers[old_render_order][entity]
+            self.render_layers[entity.render_order][entity] = None
+            self.refresh_glyph(entity.x, entity.y)
 
     def remove_entity(self, entity):
-        if entity in self.entities:
-            self.entities.remove(entity)
+        if entity not in self.entity_index.entities:
             return
 
-        for room in self.rooms:
-            if entity in room.entities:
-                self.entities.remove(entity)
-                return
+        entity.entity_holder.remove_entity(entity)
+        self.entity_index.remove_entity(entity)
+        self.render_layers[entity.render_order].pop(entity, None)
+        self.refresh_glyph(entity.x, entity.y)
+        self.refresh_cost(entity.x, entity.y)
+        if entity.colours_bg:
+            self.refresh_bg_colour(entity.x, entity.y)
+        if entity.is_type(EntityID.WALL):
+            self.refresh_wall(entity.x, entity.y)
+        if isinstance(entity, Actor):
+            self.engine.needs.remove(entity.animal)
+
+    def refresh_wall(self, x: int, y: int):
+        """Recheck whether there is still a wall on this tile."""
+        self.walls[x, y] = any(entity.is_type(EntityID.WALL) for entity in self.entity_index.get_entities_at_location(x, y))
+
+    def retile_walls(self, start_x: int, start_y: int, end_x: int, end_y: int):
+        """Pick the glyph for every wall between start and end (inclusive) from which of its sides have walls next to them."""
+        start_x, start_y = max(start_x, 0), max(start_y, 0)
+        end_x, end_y = min(end_x, self.width - 1), min(end_y, self.height - 1)
+        if start_x > end_x or start_y > end_y:
+            return
+
+        # Look a tile further out so walls on the edge of the region can see their neighbours
+        pad_x, pad_y = max(start_x - 1, 0), max(start_y - 1, 0)
+        masks = utility.get_neighbour_masks(self.walls[pad_x: end_x + 2, pad_y: end_y + 2])
+        masks = masks[start_x - pad_x: end_x - pad_x + 1, start_y - pad_y: end_y - pad_y + 1]
+
+        wall_x, wall_y = np.nonzero(self.walls[start_x: end_x + 1, start_y: end_y + 1])
+        for x, y, mask in zip(wall_x, wall_y, masks[wall_x, wall_y]):
+            for entity in self.entity_index.get_entities_at_location(start_x + int(x), start_y + int(y)):
+                if entity.is_type(EntityID.WALL):
+                    entity.char = WALL_GLYPHS[mask]
 
     def get_neighbouring_tiles(self, position: Tuple[int, int], neighbourhood: Neighbourhood):
         if neighbourhood is Neighbourhood.VON_NEUMANN:
@@ -120,17 +310,17 @@ class GameMap:
 
     @property
     def actors(self) -> Iterator[Actor]:
-        """Iterate over this maps living actors."""
+        """Iterate over this maps living actors. Only the actor render layer is looked at, rather than every wall and prop."""
         yield from (
             entity
-            for entity in self.entity_holder.entities
+            for entity in self.render_layers[RenderOrder.ACTOR]
             if isinstance(entity, Actor) and entity.is_alive
         )
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        for entity in self.entity_holder.locations.get((x, y), ()):
+            if isinstance(entity, Actor) and entity.is_alive:
+                return entity
 
         return None
 
@@ -144,48 +334,48 @@ class GameMap:
         return entities
 
     def get_entities_at_location(self, x: int, y: int) -> list(Entity):
-        entities = list()
-        for entity in self.entities:
-            if entity.x == x and entity.y == y:
-                entities.append(entity)
-
-        for room in self.rooms:
-            for entity in room.entities:
-                if entity.x == x and entity.y == y:
-                    entities.append(entity)
-
-        return entities
+        return self.entity_index.get_entities_at_location(x, y)
 
     def get_tile_bg_colour(self, x: int, y: int) -> Tuple[int, int, int]:
-        for entity in reversed(sorted(self.get_entities_at_location(x, y), key=lambda x: x.render_order.value)):
-            if entity.colours_bg:
-                return entity.bg_colour
+        if self.bg_override_mask[x, y]:
+            np_colour_array = self.bg_override[x, y]
+        else:
+            np_colour_array = self.tiles[x, y]["graphic"]["bg"]
 
-        np_colour_array = self.tiles[x, y]["graphic"]["bg"]
         return [np_colour_array[0], np_colour_array[1], np_colour_array[2]]
 
-    def get_blocking_entity_at_location(self, location_x: int, location_y: int,) -> Optional[Entity]:
-        for entity in self.entities:
-            if (
-                entity.blocks_movement
-                and entity.x == location_x
-                and entity.y == location_y
-            ):
-                return entity
+    def refresh_bg_colour(self, x: int, y: int):
+        """Work out which entity, if any, colours the background of a tile and store it in the override layer."""
+        top_entity = None
+        for entity in self.entity_index.locations.get((x, y), ()):
+            if entity.colours_bg and (top_entity is None or entity.render_order.value >= top_entity.render_order.value):
+                top_entity = entity
 
-        for room in self.rooms:
-            for entity in room.entities:
-                if (
-                    entity.blocks_movement
-                    and entity.x == location_x
-                    and entity.y == location_y
-                ):
-                    return entity
+        if top_entity is None:
+            self.bg_override_mask[x, y] = False
+        else:
+            self.bg_override_mask[x, y] = True
+            self.bg_override[x, y] = top_entity.bg_colour
 
-        return None
+    def refresh_glyph(self, x: int, y: int):
+        """Work out which entity is drawn on top of a tile, the one with the highest render order, and store its glyph."""
+        top_entity = None
+        for entity in self.entity_index.locations.get((x, y), ()):
+            if top_entity is None or entity.render_order.value >= top_entity.render_order.value:
+                top_entity = entity
+
+        self.render_batch.set_tile(x, y, top_entity)
+
+    def get_bg_colours(self) -> np.ndarray:
+        """Return the background colour of every tile, with the tiles covered by props coloured by them."""
+        return np.where(self.bg_override_mask[:, :, np.newaxis], self.bg_override, self.tiles["graphic"]["bg"])
+
+    def get_blocking_entity_at_location(self, location_x: int, location_y: int,) -> Optional[Entity]:
+        return self.entity_index.get_blocking_entity_at_location(location_x, location_y)
 
     def replace_tile(self, x: int, y: int, tile: np.ndarray):
         self.tiles[x, y] = tile
+        self.refresh_cost(x, y)
 
     def get_room(self, room_type: RoomType):
         return self.room_holder.get_room(room_type)
@@ -1,28 +1,107 @@
 from __future__ import annotations
 
 import numpy as np  # type: ignore
+import scipy.optimize
 import tile_types
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING, Tuple
+from typing import Iterable, Iterator, List, Optional, TYPE_CHECKING, Tuple
 from tcod.console import Console
-from datetime import datetime
 
 from entity import Actor
+from enum import auto, Enum
+from needs import Activity, Need
 import tcod
-import queue
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
     from action import Action
+    from rooms import Room
+    from blueprints import Blueprint
+
+
+class JobType(Enum):
+    OTHER = auto()
+    WALL = auto()
+    FLOOR = auto()
+    PROP = auto()
+    FIELD = auto()
+
+    @staticmethod
+    def get_priority(job_type: JobType) -> int:
+        """Higher priority jobs get handed out first, wherever they are."""
+        if job_type is JobType.WALL:
+            return 4
+        if job_type is JobType.PROP:
+            return 3
+        if job_type is JobType.FLOOR:
+            return 2
+        if job_type is JobType.FIELD:
+            return 1
+        return 2
+
+
+class AssignmentMode(Enum):
+    INDIVIDUAL = auto()  # Each worker claims the nearest job for themselves when they want one
+    BATCH = auto()  # All the workers wanting a job are matched to jobs together once per tick
+
+
+class JobMetrics:
+    """Running totals used to compare how well the different assignment modes keep everyone busy."""
+
+    def __init__(self):
+        self.ticks = 0
+        self.hours = 0.0
+        self.jobs_assigned = 0
+        self.jobs_completed = 0
+        self.jobs_rejected = 0
+        self.travel_ticks = 0
+        self.travels = 0
+
+    def tick(self, hours: float):
+        self.ticks += 1
+        self.hours += hours
+
+    def record_assigned(self):
+        self.jobs_assigned += 1
+
+    def record_travel(self, ticks: int):
+        self.travel_ticks += ticks
+        self.travels += 1
+
+    def record_completed(self):
+        self.jobs_completed += 1
+
+    def add_hours(self, hours: float):
+        """Count time that passed without any ticks, when the engine skips time."""
+        self.hours += hours
+
+    def record_rejected(self):
+        self.jobs_rejected += 1
+
+    @property
+    def jobs_per_hour(self) -> float:
+        return self.jobs_completed / self.hours if self.hours else 0.0
+
+    @property
+    def mean_travel(self) -> float:
+        return self.travel_ticks / self.travels if self.travels else 0.0
+
+    def get_report(self) -> str:
+        report = f"{self.jobs_per_hour:.1f} jobs/hour, {self.mean_travel:.1f} ticks travel"
+        if self.jobs_rejected:
+            report += f", {self.jobs_rejected} rejected"
+        return report
 
 
 class BaseJob:
     """Class representing a job that some actor is going to go do."""
 
-    def __init__(self, locations, completionAction=None, cancelAction=None, startAction=None, instantAction=None, name: str = "<unnamed>"):
+    activity = Activity.IDLE  # What the worker is doing while at the job, for their needs
+
+    def __init__(self, locations, completionAction=None, cancelAction=None, startAction=None, instantAction=None, name: str = "<unnamed>", room: Room = None, job_type: JobType = JobType.OTHER):
 
-        if isinstance(locations[0], list):
+        if isinstance(locations[0], (list, tuple)):
             self.locations = locations
         else:
             self.locations = [locations]
@@ -31,6 +110,8 @@ class BaseJob:
         self.name = name
         self.in_progress = False
         self.worker = None
+        self.room = room  # Room the job takes place in, if any. Lets workers find it using the room's shared flow field
+        self.job_type = job_type
 
         self.instantAction = instantAction  # Action to be performed when this job is created
         self.completionAction = completionAction  # Actions to be performed when the job is completed
@@ -43,6 +124,14 @@ class BaseJob:
     def update(self):
         pass
 
+    def is_waiting(self) -> bool:
+        """Whether working on this job is just waiting for it to finish, rather than making progress on it every tick."""
+        return False
+
+    def get_finish_minute(self) -> Optional[int]:
+        """Calendar minute this job will finish at if left alone, or None if there's no telling."""
+        return None
+
     def complete(self):
         """Mark self as completed and trigger completion event."""
         # self.worker.engine.message_log.add_message(f"Job {self.name} has been completed by {self.worker.entity.name}")
@@ -87,9 +176,10 @@ class BaseJob:
 
 
 class JobEffort(BaseJob):
+    activity = Activity.WORKING
 
-    def __init__(self, locations, work: float, completionAction=None, cancelAction=None, startAction=None, instantAction=None, name: str = "<unnamed>"):
-        super().__init__(locations, completionAction, cancelAction, startAction, instantAction, name)
+    def __init__(self, locations, work: float, completionAction=None, cancelAction=None, startAction=None, instantAction=None, name: str = "<unnamed>", job_type: JobType = JobType.OTHER):
+        super().__init__(locations, completionAction, cancelAction, startAction, instantAction, name, job_type=job_type)
         self.work = work
 
     def update(self, worker: Actor):
@@ -105,9 +195,11 @@ class JobEffort(BaseJob):
 
 class JobUntil(BaseJob):
 
-    def __init__(self, locations, finish_time: datetime, completionAction=None, cancelAction=None, startAction=None, instantAction=None, name: str = "<unnamed>"):
-        super().__init__(locations, completionAction, cancelAction, startAction, instantAction, name)
-        self.finish_time = finish_time
+    def __init__(self, locations, finish_time: int, completionAction=None, cancelAction=None, startAction=None, instantAction=None, name: str = "<unnamed>", room: Room = None):
+        super().__init__(locations, completionAction, cancelAction, startAction, instantAction, name, room)
+        self.finish_time = finish_time  # In calendar minutes
+        self.timer = None
+        self.finished = False
 
     def update(self, worker: Actor):
         """Do some amount of work to the job. If the job is down then complete."""
@@ -116,13 +208,32 @@ class JobUntil(BaseJob):
         if not self.in_progress:
             self.start()
 
-        if self.worker.gamemap.engine.calendar.get_current_date_time() > self.finish_time:
+        # The first time we get to the job, have the engine's timers tell us when it's over rather than checking every tick
+        if self.timer is None:
+            engine = self.worker.gamemap.engine
+            self.timer = engine.timers.schedule(self.finish_time + 1, self.finish)
+            self.finished = engine.calendar.minutes > self.finish_time
+
+        if self.finished:
+            self.timer.cancel()
             self.complete()
 
+    def finish(self):
+        self.finished = True
+
+    def is_waiting(self) -> bool:
+        return True
+
+    def get_finish_minute(self) -> Optional[int]:
+        return self.finish_time + 1
+
 
 class JobActorCondition(BaseJob):
-    def __init__(self, locations, finish_condition, completionAction=None, cancelAction=None, startAction=None, name: str = "<unnamed>"):
-        super().__init__(locations, completionAction, cancelAction, startAction, name)
+    """Waits at the job's location until finish_condition is true of the worker. The condition is checked every tick
+    and there's no telling when it will become true, so time is never skipped while someone is doing one of these."""
+
+    def __init__(self, locations, finish_condition, completionAction=None, cancelAction=None, startAction=None, name: str = "<unnamed>", room: Room = None):
+        super().__init__(locations, completionAction, cancelAction, startAction, name=name, room=room)
         self.condition = finish_condition
 
     def update(self, worker: Actor):
@@ -135,9 +246,325 @@ class JobActorCondition(BaseJob):
             self.complete()
 
 
+class JobNeed(BaseJob):
+    """Waits at the job's location until one of the worker's needs goes past a threshold, e.g. until they've eaten.
+    Rather than checking the need every tick, the job subscribes to the worker's animal and is told when it crosses.
+    If earliest_finish is given the worker carries on until that calendar minute even once the need is met."""
+
+    def __init__(self, locations, need: Need, threshold: float, above: bool = True, activity: Activity = Activity.IDLE, earliest_finish: Optional[int] = None, completionAction=None, cancelAction=None, startAction=None, name: str = "<unnamed>", room: Room = None):
+        super().__init__(locations, completionAction, cancelAction, startAction, name=name, room=room)
+        self.activity = activity
+        self.need = need
+        self.threshold = threshold
+        self.above = above
+        self.earliest_finish = earliest_finish
+        self.subscription = None
+        self.timer = None
+        self.need_met = False
+        self.time_met = earliest_finish is None
+
+    def update(self, worker: Actor):
+        self.worker = worker
+
+        if not self.in_progress:
+            self.start()
+
+        # The first time we get to the job, check the need once and then wait to hear it has crossed the threshold
+        if self.subscription is None:
+            animal = self.worker.animal
+            self.subscription = animal.subscribe(self.need, self.threshold, self.above, self.meet_need)
+            self.need_met = self.subscription.is_past(animal.get_need(self.need))
+
+            if not self.time_met:
+                engine = self.worker.gamemap.engine
+                self.timer = engine.timers.schedule(self.earliest_finish, self.meet_time)
+                self.time_met = engine.calendar.minutes >= self.earliest_finish
+
+        if self.need_met and self.time_met:
+            self.stop_waiting()
+            self.complete()
+
+    def meet_need(self):
+        self.need_met = True
+
+    def meet_time(self):
+        self.time_met = True
+
+    def stop_waiting(self):
+        if self.subscription is not None:
+            self.worker.animal.unsubscribe(self.subscription)
+        if self.timer is not None:
+            self.timer.cancel()
+
+    def cancel(self):
+        self.stop_waiting()
+        super().cancel()
+
+    def is_waiting(self) -> bool:
+        return True
+
+    def get_finish_minute(self) -> Optional[int]:
+        if self.subscription is None:
+            return None
+
+        minutes = self.worker.animal.get_minutes_until(self.subscription)
+        if minutes is None:
+            return None
+
+        finish_minute = self.worker.gamemap.engine.calendar.minutes + minutes
+        if self.earliest_finish is not None:
+            finish_minute = max(finish_minute, self.earliest_finish)
+        return finish_minute
+
+
 class Jobs:
-    """Container of all jobs. Different queues for different types of jobs."""
+    """Board of all the jobs waiting for someone to do them.
+    Jobs are kept by priority and by the map buckets their locations fall in, so a worker can claim the nearest
+    high priority job by searching outwards from where they are standing instead of looking at every job.
+    The board holds at most max_jobs jobs, anything added past that is turned away.
+    Workers wanting a job are matched to jobs together once a tick, unless the board is put in INDIVIDUAL mode."""
 
-    def __init__(self, engine: Engine):
+    def __init__(self, engine: Engine, bucket_size: int = 8, mode: AssignmentMode = AssignmentMode.BATCH, candidates_per_worker: int = 4, max_jobs: int = 2048, max_batch_workers: int = 16):
         self.engine = engine
-        self.queue = queue.Queue()
+        self.bucket_size = bucket_size
+        self.max_jobs = max_jobs
+        self.mode = mode
+        self.candidates_per_worker = candidates_per_worker  # How many nearby jobs each worker brings to the batch matching
+        self.max_batch_workers = max_batch_workers  # Workers past this many claim the nearest job for themselves
+        self.metrics = JobMetrics()
+        self.buckets = dict()  # Priority -> bucket -> jobs with a location in that bucket. Dicts are used as ordered sets
+        self.job_buckets = dict()  # Job -> buckets it has been put in
+        self.blueprints = list()  # Blueprints still handing out jobs
+
+    def __len__(self) -> int:
+        return len(self.job_buckets)
+
+    def empty(self) -> bool:
+        return len(self.job_buckets) == 0
+
+    def is_full(self) -> bool:
+        return len(self.job_buckets) >= self.max_jobs
+
+    def add_job(self, job: BaseJob) -> bool:
+        """Put a job on the board. Returns False if the board is full and the job was rejected, it's up to the caller to say so."""
+        if self.is_full():
+            self.metrics.record_rejected()
+            return False
+
+        priority = JobType.get_priority(job.job_type)
+        buckets = self.buckets.setdefault(priority, dict())
+
+        job_buckets = set()
+        for location in job.locations:
+            bucket = self.get_bucket(location[0], location[1])
+            buckets.setdefault(bucket, dict())[job] = None
+            job_buckets.add(bucket)
+
+        self.job_buckets[job] = job_buckets
+        return True
+
+    def add_blueprint(self, blueprint: Blueprint):
+        self.blueprints.append(blueprint)
+        blueprint.release()
+
+    def remove_job(self, job: BaseJob):
+        job_buckets = self.job_buckets.pop(job, None)
+        if job_buckets is None:
+            return
+
+        buckets = self.buckets[JobType.get_priority(job.job_type)]
+        for bucket in job_buckets:
+            bucket_jobs = buckets[bucket]
+            del bucket_jobs[job]
+            if not bucket_jobs:
+                del buckets[bucket]
+
+    def get_bucket(self, x: int, y: int) -> Tuple[int, int]:
+        game_map = self.engine.game_map
+        x = max(0, min(x, game_map.width - 1))
+        y = max(0, min(y, game_map.height - 1))
+        return (x // self.bucket_size, y // self.bucket_size)
+
+    def update(self, workers: Iterable[Actor]):
+        """Once a tick, hand out jobs to everyone that wants one if we are assigning in batches."""
+        self.metrics.tick(self.engine.calendar.tick_minutes / 60)
+
+        # Blueprints can be held back by a full board, so give them another go at releasing their jobs
+        for blueprint in self.blueprints:
+            blueprint.release()
+        self.blueprints = [blueprint for blueprint in self.blueprints if not blueprint.is_finished()]
+
+        if self.mode is AssignmentMode.BATCH:
+            self.assign_jobs(workers)
+
+    def claim_job(self, x: int, y: int) -> Optional[BaseJob]:
+        """Take the nearest job that can be reached from (x, y) off the board, trying the highest priorities first."""
+        for priority in sorted(self.buckets.keys(), reverse=True):
+            job = self.find_nearest_job(self.buckets[priority], x, y)
+            if job is not None:
+                self.remove_job(job)
+                self.metrics.record_assigned()
+                return job
+
+        return None
+
+    def assign_jobs(self, workers: Iterable[Actor]):
+        """Match the workers wanting a job to jobs on the board so that the total walking distance is as small as possible.
+
+        Each worker puts forward the few nearest jobs from the highest priority that they can reach, then the real
+        walking distance from every worker to those jobs is found with a dijkstra search out from the worker, kept
+        to the area around the worker and the jobs it put forward, and the cheapest matching of workers to jobs is
+        picked from that. At most max_batch_workers are matched together, anyone else claims a job for themselves.
+        """
+        workers = [worker for worker in workers if worker.ai.wants_job()]
+        if not workers or self.empty():
+            return
+
+        workers, claimers = workers[:self.max_batch_workers], workers[self.max_batch_workers:]
+
+        candidates = dict()  # Used as an ordered set
+        nominated = list()  # Jobs each worker put forward
+        for worker in workers:
+            nearest = []
+            for priority in sorted(self.buckets.keys(), reverse=True):
+                nearest = self.find_nearest_jobs(self.buckets[priority], worker.x, worker.y, self.candidates_per_worker)
+                if nearest:
+                    candidates.update(dict.fromkeys(nearest))
+                    break
+            nominated.append(nearest)
+
+        # A single worker has nobody to compete with, so the nearest job is already the best one
+        if len(workers) > 1 and candidates:
+            candidates = list(candidates)
+            costs = self.get_travel_costs(workers, nominated, candidates)
+            reachable = np.isfinite(costs)
+            if reachable.any():
+                # Price the pairings nobody can walk above any matching made of real ones, rather than leaving them infinite
+                costs[~reachable] = (costs[reachable].max() + 1) * len(workers)
+                worker_indices, job_indices = scipy.optimize.linear_sum_assignment(costs)
+
+                for worker_index, job_index in zip(worker_indices, job_indices):
+                    if not reachable[worker_index, job_index]:
+                        continue
+
+                    job = candidates[job_index]
+                    self.remove_job(job)
+                    self.metrics.record_assigned()
+                    workers[worker_index].ai.assign_job(job)
+        else:
+            claimers = workers + claimers
+
+        for worker in claimers:
+            job = self.claim_job(worker.x, worker.y)
+            if job is not None:
+                worker.ai.assign_job(job)
+
+    def get_travel_costs(self, workers: List[Actor], nominated: List[List[BaseJob]], jobs: List[BaseJob]) -> np.ndarray:
+        """Return a workers x jobs array of the walking distance from each worker to the nearest location of each job.
+
+        Each worker's search only covers the box around it that reaches a bucket past the furthest job it put forward,
+        so jobs outside that box, or only reachable by leaving it, are infinitely far away for that worker.
+        """
+        costs = np.full((len(workers), len(jobs)), np.inf)
+
+        # Flatten the job locations so every worker's distances can be looked up in one go
+        locations = np.array([location for job in jobs for location in job.locations], dtype=np.intp)
+        owners = np.repeat(np.arange(len(jobs)), [len(job.locations) for job in jobs])
+        game_map = self.engine.game_map
+        in_bounds = (locations[:, 0] >= 0) & (locations[:, 0] < game_map.width) & (locations[:, 1] >= 0) & (locations[:, 1] < game_map.height)
+        locations, owners = locations[in_bounds], owners[in_bounds]
+
+        for worker_index, worker in enumerate(workers):
+            if not nominated[worker_index]:
+                continue
+
+            reach = self.bucket_size + max(
+                job.chebyshev_distance(location, (worker.x, worker.y))
+                for job in nominated[worker_index] for location in job.locations
+            )
+            x0, x1 = max(0, worker.x - reach), min(game_map.width, worker.x + reach + 1)
+            y0, y1 = max(0, worker.y - reach), min(game_map.height, worker.y + reach + 1)
+
+            # Same step costs as the map's own graph
+            graph = tcod.path.SimpleGraph(cost=np.ascontiguousarray(game_map.cost[x0:x1, y0:y1]), cardinal=2, diagonal=3)
+            pathfinder = tcod.path.Pathfinder(graph)
+            pathfinder.add_root((worker.x - x0, worker.y - y0))
+            pathfinder.resolve()
+            unreachable = np.iinfo(pathfinder.distance.dtype).max
+
+            inside = (locations[:, 0] >= x0) & (locations[:, 0] < x1) & (locations[:, 1] >= y0) & (locations[:, 1] < y1)
+            window_distances = pathfinder.distance[locations[inside, 0] - x0, locations[inside, 1] - y0]
+            distances = window_distances.astype(np.float64)
+            distances[window_distances == unreachable] = np.inf
+            np.minimum.at(costs[worker_index], owners[inside], distances)
+
+        return costs
+
+    def find_nearest_job(self, buckets, x: int, y: int) -> Optional[BaseJob]:
+        """Search rings of buckets outwards from (x, y) until nothing further out can beat the best job found."""
+        nearest = self.find_nearest_jobs(buckets, x, y, 1)
+        return nearest[0] if nearest else None
+
+    def find_nearest_jobs(self, buckets, x: int, y: int, count: int) -> List[BaseJob]:
+        """Return up to count of the nearest reachable jobs to (x, y), nearest first.
+        Searches rings of buckets outwards until nothing further out can beat the jobs already found."""
+        if not buckets:
+            return []
+
+        game_map = self.engine.game_map
+        regions = game_map.get_walkable_regions()
+        region = regions[x, y] if game_map.in_bounds(x, y) else 0
+
+        start_x, start_y = self.get_bucket(x, y)
+        max_radius = max(game_map.width, game_map.height) // self.bucket_size + 1
+
+        found = []  # (distance, order found, job)
+        checked = set()
+        for radius in range(0, max_radius + 1):
+            for bucket in self.get_bucket_ring(start_x, start_y, radius):
+                for job in buckets.get(bucket, ()):
+                    if job in checked:
+                        continue
+                    checked.add(job)
+
+                    distance = self.get_reachable_distance(job, x, y, regions, region)
+                    if distance is not None:
+                        found.append((distance, len(checked), job))
+
+            # Every tile in the next ring out is further away than this
+            if len(found) >= count:
+                found.sort(key=lambda item: item[:2])
+                del found[count:]
+                if found[-1][0] <= radius * self.bucket_size:
+                    break
+
+        found.sort(key=lambda item: item[:2])
+        return [job for _, _, job in found[:count]]
+
+    def get_bucket_ring(self, center_x: int, center_y: int, radius: int):
+        if radius == 0:
+            yield (center_x, center_y)
+            return
+
+        for bucket_x in range(center_x - radius, center_x + radius + 1):
+            yield (bucket_x, center_y - radius)
+            yield (bucket_x, center_y + radius)
+        for bucket_y in range(center_y - radius + 1, center_y + radius):
+            yield (center_x - radius, bucket_y)
+            yield (center_x + radius, bucket_y)
+
+    def get_reachable_distance(self, job: BaseJob, x: int, y: int, regions: np.ndarray, region: int) -> Optional[int]:
+        """Return the distance to the nearest location of the job we can walk to, or None if we can't get to any."""
+        game_map = self.engine.game_map
+        distance = None
+        for location in job.locations:
+            if not game_map.in_bounds(location[0], location[1]):
+                continue
+            if region and regions[location[0], location[1]] != region:
+                continue
+
+            location_distance = job.chebyshev_distance(location, (x, y))
+            if distance is None or location_distance < distance:
+                distance = location_distance
+
+        return distance
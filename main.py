@@ -7,7 +7,7 @@ import colours
 
 from engine import Engine
 from game_map import GameMap
-from render_functions import render_names_at_mouse_location, render_map_mouse_location, render_rooms_at_mouse_location, render_fps_counter
+from render_functions import render_names_at_mouse_location, render_map_mouse_location, render_rooms_at_mouse_location, render_fps_counter, render_job_metrics
 import colours
 
 
@@ -50,6 +50,7 @@ def main() -> None:
 
             # Debug render functions
             render_fps_counter(console=root_console, x=50, y=3, fps=fps)
+            render_job_metrics(console=root_console, x=60, y=3, engine=engine)
             render_map_mouse_location(console=root_console, x=5, y=50, engine=engine)
             render_names_at_mouse_location(console=root_console, x=5, y=5, engine=engine)
             render_rooms_at_mouse_location(console=root_console, x=5, y=6, engine=engine)
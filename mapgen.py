@@ -3,14 +3,14 @@ from typing import Iterator, Tuple, TYPE_CHECKING
 import colours
 import numpy as np  # type: ignore
 from game_map import GameMap
-from voronoi import Voronoi
+from voronoi import Voronoi, RasterVoronoi
+import scipy.ndimage
 import tcod.noise
 import random
 import tile_types
-import utility
 from entity import Actor
-from actions import CreateWallAction, CreateFloorAction, CreatePropAction, CreateJobAction, RemovePendingJobAction
-from jobs import JobEffort
+from blueprints import Blueprint
+from buildings import get_building
 from rooms import RoomType
 
 if TYPE_CHECKING:
@@ -20,16 +20,24 @@ if TYPE_CHECKING:
 import entity_factories
 
 
-def generate_landscape(engine, landscape, map_width, map_height):
+def generate_landscape(engine, landscape, map_width, map_height, seed=None, raster_voronoi=False):
 
     map_center = (int(map_width / 2), int(map_height / 2))
 
-    # Generate and draw a voronoi diagram, then grab the points from a few of its sections to fill later
-    vorgen = Voronoi(40, np.array([-1, map_width + 1, -1, map_height + 1]))
-    draw_voronoi(vorgen, landscape, colours.WHITE)
-    voronoi_fill_points = get_voronoi_fill_points(random.randrange(3, 6), vorgen, landscape)
+    # Everything random about the landscape comes from here so a seed gives the same landscape
+    rng = np.random.default_rng(seed)
 
-    clear_landscape(landscape, colours.GRASS_GREEN, colours.DARK_GREEN)
+    # Generate a voronoi diagram, then grab the points from a few of its sections to fill later
+    num_fill_regions = int(rng.integers(3, 6))
+    if raster_voronoi:
+        vorgen = RasterVoronoi(40, map_width, map_height, rng)
+        voronoi_fill_points = get_raster_voronoi_fill_points(num_fill_regions, vorgen)
+    else:
+        vorgen = Voronoi(40, np.array([-1, map_width + 1, -1, map_height + 1]), rng)
+        draw_voronoi(vorgen, landscape, colours.WHITE)
+        voronoi_fill_points = get_voronoi_fill_points(num_fill_regions, vorgen, landscape)
+
+    clear_landscape(landscape, colours.GRASS_GREEN, colours.DARK_GREEN, rng)
 
     noise = tcod.noise.Noise(
         dimensions=2,
@@ -38,17 +46,17 @@ def generate_landscape(engine, landscape, map_width, map_height):
         hurst=0.5,
         lacunarity=5.0,
         octaves=2,
-        seed=None,
+        seed=int(rng.integers(2 ** 31)),
     )
 
     # Add a base layer of smooth, gradually changing noise to form base layer
     add_smooth_noise_to_landscape(landscape, noise, 0.05, colours.GRASS_GREEN, colours.DARK_GREEN)
 
     # Shade the voronoi sections we grabbed before now we have our base layer down
-    fill_regions(landscape, voronoi_fill_points, colours.DRY_MUD_BROWN, colours.WET_MUD_BROWN, colours.DARK_GREEN, colours.DRY_MUD_BROWN_B)
+    fill_regions(landscape, voronoi_fill_points, colours.DRY_MUD_BROWN, colours.WET_MUD_BROWN, colours.DARK_GREEN, colours.DRY_MUD_BROWN_B, rng)
 
     # Add more granular noise on top to break things up
-    add_noise_to_landscape(landscape, noise, 0.9, colours.GRASS_GREEN, colours.DARK_GREEN)
+    add_noise_to_landscape(landscape, noise, 0.9, colours.GRASS_GREEN, colours.DARK_GREEN, rng)
 
     # Temp building placement
     """
@@ -57,25 +65,8 @@ def generate_landscape(engine, landscape, map_width, map_height):
     place_rectangle_building(landscape, (40, 20), 5, 5)
     """
     place_church(landscape, engine, (40, 35))
-
-    refectory = ('''\
-        quuuuuw
-        x.....x
-        x.....x
-        x.....x
-        euu.uur
-        ''')
-    place_building(landscape, refectory, engine, (50, 25))
-
-    dormitory = ('''\
-        quu.uuw
-        x.....xx
-        x......x
-        x......x
-        x.....xx
-        euuuuur
-        ''')
-    place_building(landscape, dormitory, engine, (47, 44))
+    place_building(landscape, "refectory", engine, (50, 25))
+    place_building(landscape, "dormitory", engine, (47, 44))
 
     # Save this version of the map so effects can happen to it over the course of the game
     save_original_colours(landscape)
@@ -84,12 +75,11 @@ def generate_landscape(engine, landscape, map_width, map_height):
     place_cloister(landscape, (map_center[0] - (cloister_size // 2), map_center[1] - (cloister_size // 2)), cloister_size)
 
 
-def clear_landscape(landscape, bg_colour, fg_colour):
-    for x in range(0, landscape.width):
-        for y in range(0, landscape.height):
-            landscape.tiles[x, y]["graphic"]["bg"] = bg_colour
-            landscape.tiles[x, y]["graphic"]["ch"] = 9617
-            landscape.tiles[x, y]["graphic"]["fg"] = colours.colour_lerp(bg_colour, fg_colour, random.random())
+def clear_landscape(landscape, bg_colour, fg_colour, rng):
+    graphic = landscape.tiles["graphic"]
+    graphic["bg"] = bg_colour
+    graphic["ch"] = 9617
+    graphic["fg"] = colours.colour_lerp_array(bg_colour, fg_colour, rng.random((landscape.width, landscape.height)))
 
 
 def draw_voronoi(vorgen, landscape, colour):
@@ -105,51 +95,66 @@ def draw_voronoi(vorgen, landscape, colour):
 
 
 def get_voronoi_fill_points(num_regions, vorgen, landscape):
+    labels, region_points = get_region_points(landscape, colours.WHITE)
+
     dirt_patch_points = list()
+    used_labels = set()
     for i in range(0, num_regions):
         point = vorgen.vor.filtered_points[i]
-        dirt_patch_points += [get_fill_points(landscape, point)]
+        label = labels[point[0], point[1]]
+
+        # Seeds sitting on an edge, or in a region we've already got, don't give us anything new
+        if label == 0 or label in used_labels:
+            dirt_patch_points += [np.empty((0, 2), dtype=np.intp)]
+            continue
+
+        used_labels.add(label)
+        dirt_patch_points += [region_points[label]]
 
     return dirt_patch_points
 
 
-def fill_regions(landscape, region_points, start_colour, end_colour, blend_colour, accent_colour):
+def get_raster_voronoi_fill_points(num_regions, vorgen):
+    # Regions come straight from the cell ids, leaving out the edges so neighbouring regions don't touch
+    labels = np.where(vorgen.edge_mask, 0, vorgen.cell_ids + 1)
+    region_points = group_points_by_label(labels, len(vorgen.points))
+
+    return [region_points[i + 1] for i in range(0, min(num_regions, len(vorgen.points)))]
+
+
+# Counts the 8 neighbours of a tile when convolved with a mask
+NEIGHBOUR_KERNEL = np.array([[1, 1, 1],
+                             [1, 0, 1],
+                             [1, 1, 1]], dtype=np.int32)
+
+
+def fill_regions(landscape, region_points, start_colour, end_colour, blend_colour, accent_colour, rng):
     # Start colour, end colour - The range of colours you want this tile to become
     # Blend colour - the colour this section blends into, tiles on the edge of the section will completely fade into it
     # accent colour - an extra dash for tiles that are completly surrounded by similar coloured tiles
-    for i in region_points:
-        for point in i:
-            landscape.tiles[point[0], point[1]]["graphic"]["bg"] = start_colour
-
-    for i in region_points:
-        for point in i:
-            x, y = point[0], point[1]
-            score = 0
-            if (x - 1, y) in i:
-                score += 1
-            if (x + 1, y) in i:
-                score += 1
-            if (x, y - 1) in i:
-                score += 1
-            if (x, y + 1) in i:
-                score += 1
-            if (x - 1, y + 1) in i:
-                score += 1
-            if (x + 1, y + 1) in i:
-                score += 1
-            if (x + 1, y - 1) in i:
-                score += 1
-            if (x + 1, y + 1) in i:
-                score += 1
+    graphic = landscape.tiles["graphic"]
 
-            if random.random() < 0.5:
-                landscape.tiles[x, y]["graphic"]["ch"] = 9617
-                landscape.tiles[x, y]["graphic"]["fg"] = colours.colour_lerp(start_colour, end_colour, min(0.4, random.random()))
+    for points in region_points:
+        if len(points) == 0:
+            continue
+
+        x, y = points[:, 0], points[:, 1]
 
-            landscape.tiles[x, y]["graphic"]["bg"] = colours.colour_lerp(blend_colour, start_colour, score / 8)
+        # Score each point by how many of its neighbours are in the same region
+        mask = np.zeros((landscape.width, landscape.height), dtype=np.int32)
+        mask[x, y] = 1
+        score = scipy.ndimage.convolve(mask, NEIGHBOUR_KERNEL, mode="constant", cval=0)[x, y]
 
-            if score is 8:
-                landscape.tiles[x, y]["graphic"]["bg"] = colours.colour_lerp(landscape.tiles[x, y]["graphic"]["bg"], accent_colour, random.random())
+        grainy = rng.random(len(points)) < 0.5
+        graphic["ch"][x[grainy], y[grainy]] = 9617
+        graphic["fg"][x[grainy], y[grainy]] = colours.colour_lerp_array(start_colour, end_colour, np.minimum(0.4, rng.random(np.count_nonzero(grainy))))
+
+        bg = colours.colour_lerp_array(blend_colour, start_colour, score / 8)
+
+        surrounded = score == 8
+        bg[surrounded] = colours.colour_lerp_array(bg[surrounded], accent_colour, rng.random(np.count_nonzero(surrounded)))
+
+        graphic["bg"][x, y] = bg
 
 
 def add_smooth_noise_to_landscape(landscape, noise, scale, start_colour, end_colour):
@@ -163,12 +168,11 @@ def add_smooth_noise_to_landscape(landscape, noise, scale, start_colour, end_col
     # Return the sampled noise from this grid of points.
     samples = noise.sample_ogrid(ogrid)
 
-    for x in range(0, landscape.width):
-        for y in range(0, landscape.height):
-            landscape.tiles[x, y]["graphic"]["bg"] = colours.colour_lerp(landscape.tiles[x, y]["graphic"]["bg"], end_colour, samples[x, y] / 1.2)
+    graphic = landscape.tiles["graphic"]
+    graphic["bg"] = colours.colour_lerp_array(graphic["bg"], end_colour, samples / 1.2)
 
 
-def add_noise_to_landscape(landscape, noise, threshold, start_colour, end_colour):
+def add_noise_to_landscape(landscape, noise, threshold, start_colour, end_colour, rng):
     # Create an open multi-dimensional mesh-grid.
     ogrid = [np.arange(landscape.width, dtype=np.float32),
              np.arange(landscape.height, dtype=np.float32)]
@@ -176,15 +180,14 @@ def add_noise_to_landscape(landscape, noise, threshold, start_colour, end_colour
     # Return the sampled noise from this grid of points.
     samples = noise.sample_ogrid(ogrid)
 
-    for x in range(0, landscape.width):
-        for y in range(0, landscape.height):
-            if samples[x, y] > threshold:
-                old_range = (1 - threshold)
-                new_value = ((samples[x, y] - threshold) / old_range)
-                colour = colours.colour_lerp(start_colour, end_colour, max(0.5, random.random()))
-                landscape.tiles[x, y]["graphic"]["ch"] = 9617
-                landscape.tiles[x, y]["graphic"]["bg"] = colour
-                landscape.tiles[x, y]["graphic"]["fg"] = colours.colour_lerp(colour, colours.DARK_GREEN, max(0.8, random.random()))
+    graphic = landscape.tiles["graphic"]
+    noisy = samples > threshold
+    count = np.count_nonzero(noisy)
+
+    colour = colours.colour_lerp_array(start_colour, end_colour, np.maximum(0.5, rng.random(count)))
+    graphic["ch"][noisy] = 9617
+    graphic["bg"][noisy] = colour
+    graphic["fg"][noisy] = colours.colour_lerp_array(colour, colours.DARK_GREEN, np.maximum(0.8, rng.random(count)))
 
 
 def line_between(
@@ -199,33 +202,29 @@ def line_between(
         yield x, y
 
 
-def get_fill_points(landscape, start_coords: Tuple[int, int]):
-    orig_value = (landscape.tiles[start_coords[0], start_coords[1]]["graphic"]["bg"]).copy()
+def get_region_points(landscape, edge_colour):
+    """Label the areas between the edges drawn in edge_colour and return the points in every one of them.
+    Regions are 4-connected, the same as flood filling from a point. Returns the label image, where edges are 0,
+    and a list of (n, 2) point arrays indexed by label."""
+    edges = np.all(landscape.tiles["graphic"]["bg"] == edge_colour, axis=-1)
+    labels, n_labels = scipy.ndimage.label(~edges)
 
-    stack = set(((start_coords[0], start_coords[1]),))
-    points = list()
-    while stack:
-        x, y = stack.pop()
-        res = all(i == j for i, j in zip(landscape.tiles[x, y]["graphic"]["bg"], orig_value))
-        if res:
-            landscape.tiles[x, y]["graphic"]["bg"] = (255 - orig_value[0], 255 - orig_value[1], 255 - orig_value[2])
-            points.append((x, y))
-            if x > 0:
-                stack.add((x - 1, y))
-            if x < (landscape.width - 1):
-                stack.add((x + 1, y))
-            if y > 0:
-                stack.add((x, y - 1))
-            if y < (landscape.height - 1):
-                stack.add((x, y + 1))
+    return labels, group_points_by_label(labels, n_labels)
 
-    return points
+
+def group_points_by_label(labels, n_labels):
+    """Return a list of (n, 2) arrays of the points with each label, from 0 up to n_labels."""
+    # Group the flat tile indices by label with one sort, then cut the groups apart using the label counts
+    flat_labels = labels.ravel()
+    order = np.argsort(flat_labels, kind="stable")
+    counts = np.bincount(flat_labels, minlength=n_labels + 1)
+    points = np.stack(np.unravel_index(order, labels.shape), axis=-1)
+
+    return np.split(points, np.cumsum(counts)[:-1])
 
 
 def save_original_colours(landscape):
-    for x in range(0, landscape.width):
-        for y in range(0, landscape.height):
-            landscape.tiles[x, y]["original_bg"] = landscape.tiles[x, y]["graphic"]["bg"]
+    landscape.tiles["original_bg"] = landscape.tiles["graphic"]["bg"]
 
 
 """ Temp building generators """
@@ -297,228 +296,16 @@ def place_rectangle_building(landscape, center: Tuple[int, int], width: int, hei
 
 
 def place_church(landscape, engine, position: Tuple[int, int]):
-    # Place floor
-    width = 13
-    height = 5
-    # place_rectangle_building(landscape, position, width, height, place_door=False, wear_surrounds=False)
-
-    width = 7
-    height = 18
-    # place_rectangle_building(landscape, (position[0], position[1] + int(height / 5)), width, height, place_door=False, wear_surrounds=False)
-
-    width = 11
-    height = 3
-    # draw_rectangle(landscape, position, width, height, colour=colours.GREY, character=ord(' '))
-
-    """
-    church = ('''\
-        quuuuuw
-        x.....x
-        x.o.o.x
-        x.....x
-     quur.....euuw
-     x...........x
-     x...........x  xuux
-     x...........x  x..x
-     euuw.....qu.r  x..x
-        x.o.o.x..uuuu.uuw
-        x.....x.........x
-        x.o.o.x.o o o o.x
-        x.......       .x
-        x.o.o.x.o     o.x
-        x.....x.       .x
-        x.o.o.x.o     o.x
-        x.....x.       .x
-        x.o.o.x.o o o o.x
-        x.....x.........x
-        eu.u.uruuuuuuuuur
-        ''')
-    """
-    tiny_church = ('''\
-         quw
-        qroew
-        xh.hx
-        xh...
-        xhhhx
-        euuur
-        ''')
-
-    smaller_church = ('''\
-         quuuw
-        qr...ew
-        x.....x
-        xh...hx
-        xh...hx
-      qur.....euw
-      x.........x
-      x.........x
-      x.........x
-      euw.o.o.qur
-        xhh.hhx
-        xho.ohx
-        xhh.hhx
-        xho.ohx
-        xhh.hhx
-        x.o.o.x
-        x.....x
-        euu.uur
-        ''')
-
-    small_church = ('''\
-         quuuuw
-        qr....ew
-        x......x
-        x.o..o.x
-        x......x
-     quur.o..o.euuw
-     x............x
-     x............x
-     x............x
-     x............x
-     euuw.o..o.quur
-        x......x
-        x.o..o.x
-        x......x
-        x.o..o.x
-        x......x
-        x.o..o.x
-        x......x
-        x.o..o.x
-        x......x
-        eu.uu.ur
-        ''')
-
-    big_church = ('''\
-         quuuuuuuw
-        qr.......ew
-        x.........x
-        x.........x
-        x..o...o..x
-        x..|...|..x
-        x..|...|..x
-        x..|...|..x
-        x..|...|..x
-        x..o...o..x
-  quuuuur.........euuuuuw
-  x.....................x
-  x.o.o.o..o...o..o.o.o.x
-  x.....................x
-  x.....................x
-  x.....................x
-  x.o.o.o..o...o..o.o.o.x
-  x.....................x
-  euuuuuw..o...o..quuuuuruuuuuuuw
-        x.........x.............x
-        x..o...o..x.............x
-        x.........x..         ..xuuuuuuuuuw
-        x..o...o..x..         ..x.........x
-        x.........x..         ..x.o.o.o.o.x
-        x..o...o..x..         ..x.........x
-        x.........x..         ..x.........x
-        x..o...o..x..         ..x.o.o.o.o.x
-        x.........x..         ..x.........x
-        x..o...o..x..         ..xuuuuuuuuur
-        x.........x..         ..x
-        x..o...o..x.............x
-        x.........x.............x
-        x..o...o..xuuuuuuuuuuuuur
-        x.........x
-        x..o...o..x
-        x.........x
-        eu..uuu..ur
-        ''')
-
-    x, y = position[0], position[1]
-    wall_jobs = list()
-    floor_jobs = list()
-    prop_jobs = list()
-    for character in tiny_church:
-        if character is not ' ' and character is not "\n" and character is not "\r":
-
-            job = None
-            if character is 'x' or character is 'u' or character is 'e' or character is 'r' or character is 'q' or character is 'w':
-                locations = utility.get_vonneumann_tiles([x, y])
-                instant_action = CreatePropAction(landscape.engine.player, entity_factories.pending_job, [x, y])
-                completion_action = [CreateWallAction(landscape.engine.player, [x, y]), RemovePendingJobAction(landscape.engine.player, [x, y])]
-                job = JobEffort(locations, 1, instantAction=instant_action, completionAction=completion_action, name="Build Wall")
-                wall_jobs.append(job)
-            elif character is 'o':
-                instant_action = CreatePropAction(landscape.engine.player, entity_factories.pending_job, [x, y])
-                completion_action = [CreatePropAction(landscape.engine.player, entity_factories.stone_pillar, [x, y]), RemovePendingJobAction(landscape.engine.player, [x, y])]
-                job = JobEffort([x, y], 1, instantAction=instant_action, completionAction=completion_action, name="Create Prop")
-                prop_jobs.append(job)
-            else:
-                instant_action = CreatePropAction(landscape.engine.player, entity_factories.pending_job, [x, y])
-                completion_action = [CreateFloorAction(landscape.engine.player, [x, y]), RemovePendingJobAction(landscape.engine.player, [x, y])]
-                job = JobEffort([x, y], 1, instantAction=instant_action, completionAction=completion_action, name="Build Floor")
-                floor_jobs.append(job)
-
-            # landscape.tiles[x, y]["graphic"]["ch"] = ord(' ')
-
-        if character is "\n" or character is "\r":
-            x = position[0]
-            y += 1
-        else:
-            x += 1
-
-    for j in wall_jobs:
-        if j is not None:
-            engine.jobs.queue.put(j)
-
-    for j in prop_jobs:
-        if j is not None:
-            engine.jobs.queue.put(j)
-
-    for j in floor_jobs:
-        if j is not None:
-            engine.jobs.queue.put(j)
-
-
-def place_building(landscape, building, engine, position: Tuple[int, int]):
-    x, y = position[0], position[1]
-    wall_jobs = list()
-    floor_jobs = list()
-    prop_jobs = list()
-    for character in building:
-        if character is not ' ' and character is not "\n" and character is not "\r":
-
-            job = None
-            if character is 'x' or character is 'u' or character is 'e' or character is 'r' or character is 'q' or character is 'w':
-                locations = utility.get_vonneumann_tiles([x, y])
-                instant_action = CreatePropAction(landscape.engine.player, entity_factories.pending_job, [x, y])
-                completion_action = [CreateWallAction(landscape.engine.player, [x, y]), RemovePendingJobAction(landscape.engine.player, [x, y])]
-                job = JobEffort(locations, 1, instantAction=instant_action, completionAction=completion_action, name="Build Wall")
-                wall_jobs.append(job)
-            elif character is 'o':
-                instant_action = CreatePropAction(landscape.engine.player, entity_factories.pending_job, [x, y])
-                completion_action = [CreatePropAction(landscape.engine.player, entity_factories.stone_pillar, [x, y]), RemovePendingJobAction(landscape.engine.player, [x, y])]
-                job = JobEffort([x, y], 1, instantAction=instant_action, completionAction=completion_action, name="Create Prop")
-                prop_jobs.append(job)
-            else:
-                instant_action = CreatePropAction(landscape.engine.player, entity_factories.pending_job, [x, y])
-                completion_action = [CreateFloorAction(landscape.engine.player, [x, y]), RemovePendingJobAction(landscape.engine.player, [x, y])]
-                job = JobEffort([x, y], 1, instantAction=instant_action, completionAction=completion_action, name="Build Floor")
-                floor_jobs.append(job)
-
-            # landscape.tiles[x, y]["graphic"]["ch"] = ord(' ')
-
-        if character is "\n" or character is "\r":
-            x = position[0]
-            y += 1
-        else:
-            x += 1
+    place_building(landscape, "tiny_church", engine, position)
 
-    for j in wall_jobs:
-        if j is not None:
-            engine.jobs.queue.put(j)
 
-    for j in prop_jobs:
-        if j is not None:
-            engine.jobs.queue.put(j)
+def place_building(landscape, name: str, engine, position: Tuple[int, int]):
+    """Stamp the named building template down with its top left at position, as a blueprint for the brothers to build."""
+    building = get_building(name)
+    cells = building.cells + np.array(position, dtype=np.int32)
 
-    for j in floor_jobs:
-        if j is not None:
-            engine.jobs.queue.put(j)
+    in_bounds = (cells[:, 0] >= 0) & (cells[:, 0] < landscape.width) & (cells[:, 1] >= 0) & (cells[:, 1] < landscape.height)
+    engine.jobs.add_blueprint(Blueprint(engine, cells[in_bounds], building.kinds[in_bounds]))
 
 
 """Temp function, this file should be just for landscape stuff"""
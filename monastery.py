@@ -6,6 +6,7 @@ import tile_types
 from typing import Iterable, Iterator, Optional, TYPE_CHECKING
 from tcod.console import Console
 from entity import Actor
+from components.schedule import Horarium
 
 import tcod
 import queue
@@ -33,8 +34,10 @@ class Monastery:
         self.money = 0
         self.food = 0
 
+        self.horarium = Horarium(engine)
+
         n_brothers = 5
         for i in range(0, n_brothers):
             brother = entity_factories.brother.spawn(self.engine.game_map, i, i)
             brother.name = generate_brother_name()
-            pass
+            self.horarium.enrol(brother)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+from enum import IntEnum
+from typing import Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from components.animal import Animal
+
+
+class Need(IntEnum):
+    """Column of each need in the needs arrays."""
+    HUNGER = 0
+    THIRST = 1
+    ENERGY = 2
+
+
+class Activity(IntEnum):
+    """What an animal is doing, which decides how quickly each of its needs goes up or down."""
+    IDLE = 0
+    WORKING = 1
+    EATING = 2
+    SLEEPING = 3
+
+
+# Change in each need per minute, indexed by [activity, need]. Needs are full at max_level and run down towards 0
+RATES = np.array([
+    # HUNGER  THIRST  ENERGY
+    [-0.07, -0.06, -0.07],  # IDLE
+    [-0.1, -0.09, -0.1],  # WORKING
+    [5.0, 5.0, -0.07],  # EATING
+    [-0.03, -0.02, 0.3],  # SLEEPING
+])
+
+
+class NeedThreshold:
+    """Someone waiting to hear when a need goes past a threshold, above it or below it."""
+
+    def __init__(self, animal: Animal, need: Need, threshold: float, above: bool, callback: Callable[[], None]):
+        self.animal = animal
+        self.need = need
+        self.threshold = threshold
+        self.above = above
+        self.callback = callback
+        self.index = -1  # Slot in the needs system's watch arrays
+
+    def is_past(self, value: float) -> bool:
+        return value > self.threshold if self.above else value < self.threshold
+
+
+class Needs:
+    """The needs of every animal on the map, kept as rows of numpy arrays rather than on each animal.
+
+    Each tick every need of every animal goes up or down by the rate for what it is doing in one step, and every
+    threshold anyone is waiting on is checked in one step, so the cost in Python calls doesn't grow with the number of
+    animals. Each Animal is a view over its row. Rows are handed out when an actor is added to a map and given back
+    when it leaves, and the arrays double in size when they run out of rows.
+    """
+
+    def __init__(self, capacity: int = 16, max_level: float = 100):
+        self.max_level = max_level
+        self.levels = np.zeros((capacity, len(Need)), dtype=np.float64)
+        self.activities = np.zeros(capacity, dtype=np.int8)
+        self.animals: List[Optional[Animal]] = [None] * capacity
+        self.free_rows = list(range(capacity - 1, -1, -1))
+
+        # Thresholds being waited on, one slot each
+        self.watch_rows = np.zeros(capacity, dtype=np.int32)
+        self.watch_needs = np.zeros(capacity, dtype=np.int8)
+        self.watch_thresholds = np.zeros(capacity, dtype=np.float64)
+        self.watch_above = np.zeros(capacity, dtype=np.bool_)
+        self.watch_past = np.zeros(capacity, dtype=np.bool_)
+        self.watch_active = np.zeros(capacity, dtype=np.bool_)
+        self.watchers: List[Optional[NeedThreshold]] = [None] * capacity
+        self.free_watches = list(range(capacity - 1, -1, -1))
+        self.row_watchers: Dict[int, List[NeedThreshold]] = dict()  # Row -> thresholds being waited on for that animal
+
+    def add(self, animal: Animal):
+        """Move the animal's needs into a row of our arrays and point the animal at it."""
+        if animal.needs is self:
+            return
+
+        if not self.free_rows:
+            self.grow_rows()
+
+        row = self.free_rows.pop()
+        self.levels[row] = animal.levels
+        self.activities[row] = animal.activity
+        self.animals[row] = animal
+        animal.attach(self, row)
+
+    def remove(self, animal: Animal):
+        """Give the animal its own copy of its needs back and free up its row."""
+        if animal.needs is not self:
+            return
+
+        row = animal.row
+        for watcher in list(self.row_watchers.get(row, ())):
+            self.unsubscribe(watcher)
+
+        animal.detach(self.levels[row].copy(), Activity(self.activities[row]))
+        self.animals[row] = None
+        self.activities[row] = Activity.IDLE
+        self.free_rows.append(row)
+
+    def grow_rows(self):
+        capacity = len(self.animals)
+        self.levels = np.concatenate([self.levels, np.zeros_like(self.levels)])
+        self.activities = np.concatenate([self.activities, np.zeros_like(self.activities)])
+        self.animals.extend([None] * capacity)
+        self.free_rows.extend(range(capacity * 2 - 1, capacity - 1, -1))
+
+        # The old arrays are gone, so point everyone at their row of the new ones
+        for row, animal in enumerate(self.animals[:capacity]):
+            if animal is not None:
+                animal.attach(self, row)
+
+    def subscribe(self, animal: Animal, need: Need, threshold: float, above: bool, callback: Callable[[], None]) -> NeedThreshold:
+        if not self.free_watches:
+            self.grow_watches()
+
+        watcher = NeedThreshold(animal, need, threshold, above, callback)
+        watcher.index = self.free_watches.pop()
+        self.watch_rows[watcher.index] = animal.row
+        self.watch_needs[watcher.index] = need
+        self.watch_thresholds[watcher.index] = threshold
+        self.watch_above[watcher.index] = above
+        self.watch_past[watcher.index] = watcher.is_past(self.levels[animal.row, need])
+        self.watch_active[watcher.index] = True
+        self.watchers[watcher.index] = watcher
+        self.row_watchers.setdefault(animal.row, []).append(watcher)
+        return watcher
+
+    def unsubscribe(self, watcher: NeedThreshold):
+        if watcher.index < 0 or self.watchers[watcher.index] is not watcher:
+            return
+
+        self.watch_active[watcher.index] = False
+        self.watchers[watcher.index] = None
+        self.row_watchers[watcher.animal.row].remove(watcher)
+        self.free_watches.append(watcher.index)
+        watcher.index = -1
+
+    def grow_watches(self):
+        capacity = len(self.watchers)
+        for name in ("watch_rows", "watch_needs", "watch_thresholds", "watch_above", "watch_past", "watch_active"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+        self.watchers.extend([None] * capacity)
+        self.free_watches.extend(range(capacity * 2 - 1, capacity - 1, -1))
+
+    def update(self, minutes: int):
+        """Run everyone's needs on by minutes and tell anyone waiting on a threshold that was crossed."""
+        self.publish(self.advance(minutes))
+
+    def advance(self, minutes: int) -> np.ndarray:
+        """Run everyone's needs on by minutes in one go and return the watch slots whose thresholds were crossed.
+        Rates only depend on what each animal is doing, so any number of minutes can be applied at once."""
+        self.levels += RATES[self.activities] * minutes
+        np.clip(self.levels, 0, self.max_level, out=self.levels)
+        return self.check()
+
+    def check(self) -> np.ndarray:
+        """Return the watch slots whose need has gone past their threshold since the last check."""
+        values = self.levels[self.watch_rows, self.watch_needs]
+        past = np.where(self.watch_above, values > self.watch_thresholds, values < self.watch_thresholds)
+        crossed = np.flatnonzero(past & ~self.watch_past & self.watch_active)
+        self.watch_past = past
+        return crossed
+
+    def check_need(self, row: int, need: Need) -> List[int]:
+        """Like check, but only for the thresholds on one need of one animal, for when just that need has been set."""
+        crossed = []
+        for watcher in self.row_watchers.get(row, ()):
+            if watcher.need == need:
+                past = watcher.is_past(self.levels[row, need])
+                if past and not self.watch_past[watcher.index]:
+                    crossed.append(watcher.index)
+                self.watch_past[watcher.index] = past
+        return crossed
+
+    def publish(self, crossed: Iterable[int]):
+        for index in crossed:
+            watcher = self.watchers[index]
+            if watcher is not None:
+                watcher.callback()
+
+    def get_minutes_until(self, watcher: NeedThreshold) -> Optional[int]:
+        """Whole minutes until the watcher's need goes past its threshold if the animal keeps doing what it's doing,
+        or None if it never will."""
+        row = watcher.animal.row
+        level = self.levels[row, watcher.need]
+        rate = RATES[self.activities[row], watcher.need]
+        if watcher.is_past(level):
+            return 0
+
+        if watcher.above:
+            if rate <= 0 or watcher.threshold >= self.max_level:
+                return None
+            return int((watcher.threshold - level) // rate) + 1
+
+        if rate >= 0 or watcher.threshold <= 0:
+            return None
+        return int((level - watcher.threshold) // -rate) + 1
@@ -1,21 +1,91 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
+
+import numpy as np  # type: ignore
 
 import colours
 from tcod import Console, event
 
 if TYPE_CHECKING:
     from engine import Engine
+    from entity import Entity
     from game_map import GameMap
 
 
+class EntityRenderBatch:
+    """Packed arrays of the glyph on top of every tile with an entity on it, written to a console in one go.
+    The map keeps the batch up to date as entities are added, moved, removed or change how they look, so which entity
+    is on top of a tile is only worked out when that tile changes rather than every frame."""
+
+    def __init__(self, capacity: int = 256):
+        self.count = 0
+        self.slots = dict()  # (x, y) -> index of the tile's glyph in the arrays
+        self.allocate(capacity)
+
+    def allocate(self, capacity: int):
+        """Make room for capacity tiles, keeping the glyphs already packed."""
+        x = np.empty(capacity, dtype=np.intp)
+        y = np.empty(capacity, dtype=np.intp)
+        ch = np.empty(capacity, dtype=np.int32)
+        fg = np.empty((capacity, 3), dtype=np.uint8)
+        if self.count:
+            x[:self.count] = self.x[:self.count]
+            y[:self.count] = self.y[:self.count]
+            ch[:self.count] = self.ch[:self.count]
+            fg[:self.count] = self.fg[:self.count]
+
+        self.capacity = capacity
+        self.x, self.y, self.ch, self.fg = x, y, ch, fg
+
+    def set_tile(self, x: int, y: int, entity: Optional[Entity]):
+        """Draw the entity's glyph on this tile, or nothing if entity is None."""
+        slot = self.slots.get((x, y))
+        if entity is None:
+            if slot is not None:
+                self.clear_slot(slot)
+            return
+
+        if slot is None:
+            if self.count >= self.capacity:
+                self.allocate(self.capacity * 2)
+            slot = self.count
+            self.count += 1
+            self.slots[(x, y)] = slot
+            self.x[slot] = x
+            self.y[slot] = y
+
+        self.ch[slot] = ord(entity.char)
+        self.fg[slot] = entity.fg_colour
+
+    def clear_slot(self, slot: int):
+        """Stop drawing a tile, moving the last packed tile into its slot so the arrays stay packed."""
+        del self.slots[(int(self.x[slot]), int(self.y[slot]))]
+        self.count -= 1
+        last = self.count
+        if slot != last:
+            self.x[slot] = self.x[last]
+            self.y[slot] = self.y[last]
+            self.ch[slot] = self.ch[last]
+            self.fg[slot] = self.fg[last]
+            self.slots[(int(self.x[slot]), int(self.y[slot]))] = slot
+
+    def render(self, console: Console, x_offset: int, y_offset: int):
+        """Draw the glyphs. Each tile appears once, so the writes can't clash.
+        Backgrounds aren't touched, the map's background layer already includes the props that colour it."""
+        x = self.x[:self.count] + x_offset
+        y = self.y[:self.count] + y_offset
+        tiles = console.tiles_rgb
+        tiles["ch"][x, y] = self.ch[:self.count]
+        tiles["fg"][x, y] = self.fg[:self.count]
+
+
 def get_names_at_location(x: int, y: int, game_map: GameMap) -> str:
     if not game_map.in_bounds(x, y):
         return ""
 
     names = ", ".join(
-        entity.name for entity in game_map.all_entities if entity.x == x and entity.y == y
+        entity.name for entity in game_map.get_entities_at_location(x, y)
     )
 
     return names
@@ -72,6 +142,12 @@ def render_fps_counter(
 ) -> None:
     console.print(x=x, y=y, string=f"FPS:{fps}", fg=colours.WHITE)
 
+
+def render_job_metrics(
+    console: Console, x: int, y: int, engine: Engine
+) -> None:
+    console.print(x=x, y=y, string=f"{engine.jobs.mode.name}: {engine.jobs.metrics.get_report()}", fg=colours.WHITE)
+
 def render_message_box(console: Console, message: str) -> None:
 
     # TODO: Make this work with multiple line messages
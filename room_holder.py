@@ -6,6 +6,7 @@ import tile_types
 from typing import Iterable, Iterator, Optional, TYPE_CHECKING, Tuple
 from rooms import RoomType, Room
 from farm import Farm
+from components.crop import CropType
 
 import tcod
 import queue
@@ -24,10 +25,10 @@ class Rooms():
         self.rooms = list()
         pass
 
-    def add_room(self, room_type: RoomType, landscape: GameMap, tiles: list):
+    def add_room(self, room_type: RoomType, landscape: GameMap, tiles: list, crop_type: CropType = CropType.NONE):
         new_room = None
         if room_type is RoomType.FARM:
-            new_room = Farm(landscape, tiles)
+            new_room = Farm(landscape, tiles, crop_type)
         else:
             new_room = Room(landscape, room_type, tiles)
 
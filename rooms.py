@@ -3,7 +3,7 @@ from __future__ import annotations
 import numpy as np  # type: ignore
 import tile_types
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING, Tuple
+from typing import Iterable, Iterator, List, Optional, TYPE_CHECKING, Tuple
 from tcod.console import Console
 from enum import auto, Enum
 from entity import Actor
@@ -40,13 +40,24 @@ class Room():
         self.landscape = landscape
         self.type = room_type
         self.tiles = tiles
+        self.tile_set = set((tile[0], tile[1]) for tile in tiles)
         self.entity_holder = EntityHolder()
 
     def get_random_point_in_room(self) -> Tuple[int, int]:
         return self.tiles[random.randint(0, len(self.tiles) - 1)]
 
+    def get_random_points_in_room(self, count: int) -> List[Tuple[int, int]]:
+        """Return count random points that can be stood on, all different unless there are more points asked for than there are."""
+        tiles = self.tiles
+        if self.landscape.cost is not None:
+            tiles = [tile for tile in tiles if self.landscape.cost[tile[0], tile[1]]] or tiles
+
+        if count <= len(tiles):
+            return random.sample(tiles, count)
+        return [random.choice(tiles) for _ in range(count)]
+
     def is_point_in_room(self, point: Tuple[int, int]) -> bool:
-        return point in self.tiles
+        return (point[0], point[1]) in self.tile_set
 
     @property
     def name(self) -> str:
@@ -60,7 +71,9 @@ class Room():
         pass
 
     def spawn_entity(self, entity: Entity, x: int, y: int):
-        self.entities.add(entity.spawn_in_room(x, y))
+        clone = entity.spawn_in_room(x, y)
+        clone.gamemap = self.landscape
+        self.landscape.add_entity(clone, self.entity_holder)
 
     @staticmethod
     def get_room_name(room_type: RoomType):
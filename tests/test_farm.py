@@ -0,0 +1,35 @@
+import copy
+
+import entity_factories
+from components.crop import Crop, CropType
+from engine import Engine
+from rooms import RoomType
+
+
+def get_crop(game_map, x, y):
+    for entity in game_map.get_entities_at_location(x, y):
+        for physical_property in entity.physical_properties:
+            if isinstance(physical_property, Crop):
+                return physical_property
+    return None
+
+
+def test_sown_field_grows_when_the_timer_wheel_reaches_its_deadline():
+    engine = Engine(copy.deepcopy(entity_factories.player), 120, 75)
+    game_map = engine.game_map
+    game_map.room_holder.add_room(RoomType.FARM, game_map, [(10, 10), (11, 10)], CropType.WHEAT)
+    blueprint = engine.jobs.blueprints[-1]
+
+    # Fields made after the farm was set up are sown as soon as they are built
+    blueprint.complete_cell(0)
+    x, y = blueprint.cells[0]
+    crop = get_crop(game_map, x, y)
+    assert crop.crop_type is CropType.WHEAT
+    assert not crop.grown
+
+    deadline = crop.planted_time + crop.grow_time
+    engine.timers.advance_to(deadline - 1)
+    assert not crop.grown
+
+    engine.timers.advance_to(deadline)
+    assert crop.grown
@@ -0,0 +1,50 @@
+import copy
+
+import entity_factories
+from engine import Engine
+from game_map import GameMap
+
+
+def make_map():
+    engine = Engine(copy.deepcopy(entity_factories.player), 60, 40)
+    game_map = GameMap(engine, 60, 40)
+    game_map.build_cost()
+    return game_map
+
+
+def change_cost(game_map, x, y):
+    game_map.tiles["cost"][x, y] += 1
+    game_map.refresh_cost(x, y)
+
+
+def test_cost_changes_since_a_version_are_listed_newest_first():
+    game_map = make_map()
+    version = game_map.cost_version
+
+    change_cost(game_map, 1, 1)
+    change_cost(game_map, 2, 1)
+
+    assert game_map.get_cost_changes_since(version) == [(2, 1), (1, 1)]
+    assert game_map.get_cost_changes_since(game_map.cost_version) == []
+
+
+def test_cost_changes_are_unknown_once_the_log_has_overflowed():
+    game_map = make_map()
+    version = game_map.cost_version
+
+    log_size = game_map.cost_changes.maxlen
+    for index in range(log_size + 1):
+        change_cost(game_map, index % game_map.width, index // game_map.width)
+
+    assert game_map.get_cost_changes_since(version) is None
+    # Versions still covered by the log can be answered
+    assert len(game_map.get_cost_changes_since(game_map.cost_version - 5)) == 5
+
+
+def test_cost_changes_are_unknown_after_a_full_rebuild():
+    game_map = make_map()
+    version = game_map.cost_version
+
+    game_map.build_cost()
+
+    assert game_map.get_cost_changes_since(version) is None
@@ -0,0 +1,38 @@
+import copy
+
+import entity_factories
+from engine import Engine
+from game_map import GameMap
+from jobs import BaseJob, Jobs, JobType
+
+
+def make_jobs():
+    engine = Engine(copy.deepcopy(entity_factories.player), 60, 40)
+    engine.game_map = GameMap(engine, 60, 40)
+    engine.game_map.build_cost()
+    return Jobs(engine, bucket_size=8)
+
+
+def test_highest_priority_jobs_are_claimed_first_nearest_first():
+    jobs = make_jobs()
+    nearby_field = BaseJob((11, 10), name="field", job_type=JobType.FIELD)
+    far_wall = BaseJob((40, 10), name="far wall", job_type=JobType.WALL)
+    near_wall = BaseJob((25, 10), name="near wall", job_type=JobType.WALL)
+    for job in (nearby_field, far_wall, near_wall):
+        jobs.add_job(job)
+
+    assert jobs.claim_job(10, 10) is near_wall
+    assert jobs.claim_job(10, 10) is far_wall
+    assert jobs.claim_job(10, 10) is nearby_field
+    assert jobs.claim_job(10, 10) is None
+
+
+def test_ring_search_finds_a_nearer_job_in_the_next_bucket_over():
+    jobs = make_jobs()
+    # (15, 10) is in bucket (1, 1) with the job at (8, 10), but the job at (17, 10) in bucket (2, 1) is nearer
+    same_bucket = BaseJob((8, 10), name="same bucket", job_type=JobType.WALL)
+    next_bucket = BaseJob((17, 10), name="next bucket", job_type=JobType.WALL)
+    jobs.add_job(same_bucket)
+    jobs.add_job(next_bucket)
+
+    assert jobs.claim_job(15, 10) is next_bucket
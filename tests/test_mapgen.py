@@ -0,0 +1,32 @@
+import copy
+
+import numpy as np
+
+import entity_factories
+from engine import Engine
+from game_map import GameMap
+from mapgen import generate_landscape
+
+
+def generate(engine, seed, raster_voronoi):
+    game_map = GameMap(engine, 80, 50)
+    generate_landscape(engine, game_map, 80, 50, seed=seed, raster_voronoi=raster_voronoi)
+    return game_map
+
+
+def test_the_same_seed_generates_the_same_landscape():
+    engine = Engine(copy.deepcopy(entity_factories.player), 80, 50)
+
+    for raster_voronoi in (False, True):
+        first = generate(engine, 7, raster_voronoi)
+        second = generate(engine, 7, raster_voronoi)
+        assert np.array_equal(first.tiles, second.tiles)
+
+        other = generate(engine, 8, raster_voronoi)
+        assert not np.array_equal(first.tiles, other.tiles)
+
+
+def test_engine_passes_its_seed_to_the_landscape():
+    first = Engine(copy.deepcopy(entity_factories.player), 80, 50, seed=3, raster_voronoi=True)
+    second = Engine(copy.deepcopy(entity_factories.player), 80, 50, seed=3, raster_voronoi=True)
+    assert np.array_equal(first.game_map.tiles, second.game_map.tiles)
@@ -0,0 +1,60 @@
+import pytest
+
+from components.animal import Animal
+from needs import Activity, Need, Needs, RATES
+
+
+def test_needs_run_down_at_the_rate_for_each_animals_activity():
+    needs = Needs()
+    idle, sleeping = Animal(hp=10), Animal(hp=10)
+    needs.add(idle)
+    needs.add(sleeping)
+    sleeping.activity = Activity.SLEEPING
+    sleeping.set_need(Need.ENERGY, 50)
+
+    needs.update(10)
+
+    assert idle.get_need(Need.HUNGER) == pytest.approx(100 + RATES[Activity.IDLE, Need.HUNGER] * 10)
+    assert sleeping.get_need(Need.HUNGER) == pytest.approx(100 + RATES[Activity.SLEEPING, Need.HUNGER] * 10)
+    assert sleeping.get_need(Need.ENERGY) == pytest.approx(50 + RATES[Activity.SLEEPING, Need.ENERGY] * 10)
+
+    # Needs never go past full
+    needs.update(1000)
+    assert sleeping.get_need(Need.ENERGY) == needs.max_level
+
+
+def test_threshold_is_published_once_on_the_minute_it_is_predicted_to_be_crossed():
+    needs = Needs()
+    animal = Animal(hp=10)
+    needs.add(animal)
+    crossed = []
+    watcher = animal.subscribe(Need.HUNGER, 50, False, lambda: crossed.append(animal.get_need(Need.HUNGER)))
+
+    minutes = animal.get_minutes_until(watcher)
+    needs.update(minutes - 1)
+    assert crossed == []
+
+    needs.update(1)
+    assert len(crossed) == 1 and crossed[0] < 50
+
+    needs.update(100)
+    assert len(crossed) == 1
+
+
+def test_rows_survive_the_arrays_growing_and_are_handed_back_on_removal():
+    needs = Needs(capacity=2)
+    animals = [Animal(hp=10) for _ in range(5)]
+    for index, animal in enumerate(animals):
+        needs.add(animal)
+        animal.set_need(Need.THIRST, index * 10)
+
+    assert len(needs.animals) >= 5
+    for index, animal in enumerate(animals):
+        assert animal.levels.base is needs.levels
+        assert animal.get_need(Need.THIRST) == index * 10
+
+    removed = animals[3]
+    needs.remove(removed)
+    needs.update(10)
+    assert removed.needs is None
+    assert removed.get_need(Need.THIRST) == 30
@@ -0,0 +1,48 @@
+from timers import TimerWheel
+
+
+def test_timers_fire_in_the_order_they_are_due_across_levels():
+    wheel = TimerWheel()
+    fired = []
+    # 64 minutes per first level block, 4096 per second level block
+    for minute in (4100, 70, 5, 64, 5, 300):
+        wheel.schedule(minute, lambda minute=minute: fired.append((minute, wheel.minute)))
+
+    wheel.advance_to(5000)
+
+    assert fired == [(5, 5), (5, 5), (64, 64), (70, 70), (300, 300), (4100, 4100)]
+    assert len(wheel) == 0
+
+
+def test_cancelled_timers_do_not_fire_and_can_be_rearmed_on_another_level():
+    wheel = TimerWheel()
+    fired = []
+
+    far = wheel.schedule(4100, lambda: fired.append("far"))
+    near = wheel.schedule(10, lambda: fired.append("near"))
+    far.cancel()
+    near.cancel()
+
+    # Re-arm each of them on a different level from where it was
+    wheel.schedule(10, lambda: fired.append("far rearmed"))
+    wheel.schedule(4100, lambda: fired.append("near rearmed"))
+    assert wheel.get_next_minute() == 10
+
+    wheel.advance_to(4099)
+    assert fired == ["far rearmed"]
+    assert wheel.get_next_minute() == 4100
+
+    wheel.advance_to(4100)
+    assert fired == ["far rearmed", "near rearmed"]
+    assert len(wheel) == 0
+    assert wheel.get_next_minute() is None
+
+
+def test_timers_for_minutes_already_passed_fire_on_the_next_minute():
+    wheel = TimerWheel(minute=100)
+    fired = []
+    wheel.schedule(50, lambda: fired.append(wheel.minute))
+
+    wheel.advance_to(101)
+
+    assert fired == [101]
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Callable, List, Optional
+
+
+class Timer:
+    """A callback waiting in a TimerWheel for a calendar minute to come round."""
+
+    def __init__(self, minute: int, callback: Callable[[], None]):
+        self.minute = minute
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """Calls callbacks when the calendar reaches the minute they asked for, without looking at them before then.
+
+    Timers are kept in levels of slots. The first level has a slot for each of the next slot_count minutes, the next
+    level a slot for each of the next slot_count blocks of slot_count minutes, and so on. When the first level comes
+    round to its start again, the timers in the next level's slot for the block just reached are spread out over the
+    first level, so each timer is only ever moved a few times however far away it is.
+    """
+
+    def __init__(self, minute: int = 0, slot_bits: int = 6, levels: int = 4):
+        self.minute = minute  # Last minute the wheel has run up to
+        self.slot_bits = slot_bits
+        self.slot_count = 1 << slot_bits
+        self.slot_mask = self.slot_count - 1
+        self.levels: List[List[List[Timer]]] = [[[] for _ in range(self.slot_count)] for _ in range(levels)]
+        self.overflow: List[Timer] = []  # Timers too far away for even the last level
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def schedule(self, minute: int, callback: Callable[[], None]) -> Timer:
+        """Call callback once the wheel reaches minute. Minutes that have already passed are called on the next minute."""
+        timer = Timer(max(minute, self.minute + 1), callback)
+        self.insert(timer)
+        self.count += 1
+        return timer
+
+    def insert(self, timer: Timer):
+        delta = timer.minute - self.minute
+        for level, slots in enumerate(self.levels):
+            if delta < 1 << (self.slot_bits * (level + 1)):
+                slots[(timer.minute >> (self.slot_bits * level)) & self.slot_mask].append(timer)
+                return
+
+        self.overflow.append(timer)
+
+    def advance_to(self, minute: int):
+        """Run up to minute, calling every timer that comes due on the way in the order they are due."""
+        while self.minute < minute:
+            self.minute += 1
+            if self.minute & self.slot_mask == 0:
+                self.cascade(1)
+
+            slot = self.levels[0][self.minute & self.slot_mask]
+            if not slot:
+                continue
+
+            self.levels[0][self.minute & self.slot_mask] = []
+            for timer in slot:
+                self.count -= 1
+                if not timer.cancelled:
+                    timer.callback()
+
+    def cascade(self, level: int):
+        """Spread the timers for the block we have just reached at this level out over the levels below it."""
+        if level >= len(self.levels):
+            timers, self.overflow = self.overflow, []
+        else:
+            index = (self.minute >> (self.slot_bits * level)) & self.slot_mask
+            if index == 0:
+                self.cascade(level + 1)
+            timers, self.levels[level][index] = self.levels[level][index], []
+
+        for timer in timers:
+            if timer.cancelled:
+                self.count -= 1
+            else:
+                self.insert(timer)
+
+    def get_next_minute(self) -> Optional[int]:
+        """Minute the next timer is due at, or None if there are no timers waiting."""
+        next_minute = None
+        for level, slots in enumerate(self.levels):
+            # Slots in the order the blocks they hold come round, starting with the one after the current block
+            start = (self.minute >> (self.slot_bits * level)) + 1
+            for offset in range(self.slot_count):
+                minutes = [timer.minute for timer in slots[(start + offset) & self.slot_mask] if not timer.cancelled]
+                if minutes:
+                    if next_minute is None or min(minutes) < next_minute:
+                        next_minute = min(minutes)
+                    break
+
+        minutes = [timer.minute for timer in self.overflow if not timer.cancelled]
+        if minutes and (next_minute is None or min(minutes) < next_minute):
+            next_minute = min(minutes)
+
+        return next_minute
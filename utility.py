@@ -1,7 +1,15 @@
+import numpy as np  # type: ignore
+
 from typing import Iterable, Iterator, Optional, TYPE_CHECKING, Tuple
 from enum import Enum, auto
 import tcod
 
+# Bits of a neighbour mask, one for each side of a tile
+NORTH = 1
+EAST = 2
+SOUTH = 4
+WEST = 8
+
 
 class Neighbourhood(Enum):
     VON_NEUMANN = auto()
@@ -16,6 +24,16 @@ def get_vonneumann_tiles(position: Tuple[int, int]):
             )
 
 
+def get_neighbour_masks(mask: np.ndarray) -> np.ndarray:
+    """For every tile of a [x, y] bool array, return which of its four sides have a set neighbour as NORTH | EAST | SOUTH | WEST bits."""
+    masks = np.zeros(mask.shape, dtype=np.uint8)
+    masks[:, 1:] |= np.where(mask[:, :-1], NORTH, 0).astype(np.uint8)
+    masks[:-1, :] |= np.where(mask[1:, :], EAST, 0).astype(np.uint8)
+    masks[:, :-1] |= np.where(mask[:, 1:], SOUTH, 0).astype(np.uint8)
+    masks[1:, :] |= np.where(mask[:-1, :], WEST, 0).astype(np.uint8)
+    return masks
+
+
 def line_between(
     start: Tuple[int, int], end: Tuple[int, int]
 ) -> Iterator[Tuple[int, int]]:
@@ -9,12 +9,15 @@ eps = sys.float_info.epsilon
 
 
 class Voronoi:
-    def __init__(self, n_towers, bounding_box):
+    def __init__(self, n_towers, bounding_box, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
+
         # Select towers inside the bounding box
         towers = np.zeros((n_towers, 2), dtype=int)
         for i in range(0, n_towers):
-            towers[i][0] = np.random.randint(0, bounding_box[1] - 1)
-            towers[i][1] = np.random.randint(0, bounding_box[3] - 1)
+            towers[i][0] = rng.integers(0, bounding_box[1] - 1)
+            towers[i][1] = rng.integers(0, bounding_box[3] - 1)
         i = self.in_box(towers, bounding_box)
         # Mirror points
         points_center = towers[i, :]
@@ -81,6 +84,31 @@ class Voronoi:
         return [int(C_x), int(C_y)]
 
 
+class RasterVoronoi:
+    """Voronoi diagram rasterised straight onto a grid, every tile gets the id of its nearest seed.
+    Scales to large maps and thousands of seeds, as nothing is done per polygon or per edge."""
+
+    def __init__(self, n_towers, width, height, rng=None):
+        if rng is None:
+            rng = np.random.default_rng()
+
+        self.width = width
+        self.height = height
+        self.points = np.stack([rng.integers(0, width, n_towers), rng.integers(0, height, n_towers)], axis=-1)
+
+        # Nearest seed for every tile in one query
+        tree = sp.spatial.cKDTree(self.points)
+        tiles = np.indices((width, height)).reshape(2, -1).T
+        _, nearest = tree.query(tiles)
+        self.cell_ids = nearest.reshape(width, height)
+
+        # A tile is an edge if the tile to its left or above belongs to a different cell.
+        # Only marking one side keeps edges a tile wide while still separating the cells
+        self.edge_mask = np.zeros((width, height), dtype=np.bool_)
+        self.edge_mask[1:, :] |= self.cell_ids[1:, :] != self.cell_ids[:-1, :]
+        self.edge_mask[:, 1:] |= self.cell_ids[:, 1:] != self.cell_ids[:, :-1]
+
+
 """
     vor = voronoi(towers, bounding_box)
 